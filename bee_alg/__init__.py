@@ -3,69 +3,191 @@ Module containing bee algorithm solver
 """
 
 import math
+from contextlib import nullcontext
 from datetime import datetime
 
 import numpy as np
 
 from bee_alg import rating, search, bee_algorithm_report
+from tui_gen.fitness_cache import FitnessCache
+from tui_gen.models.compiled_problem import CompiledProblem
+from tui_gen.parallel_rating import ParallelRater
+from tui_gen.phase_timer import PhaseTimer
+from tui_gen.progress import ConsoleReporter, ProgressRecorder, population_diversity
+from tui_gen.termination import Termination, TerminationReasonEnum
 
 
-def _sort_rated_locations(locations, locations_ratings):
+def _top_rated_indices(locations_rating, count):
     """
-    Sort rated locations
-        :param list locations: list of locations
-        :param list locations_ratings: list of location ratings
-        :return list: sorted locations by rating
+    Get indices of top rated locations without sorting whole swarm
+        :param numpy.ndarray locations_rating: location ratings
+        :param int count: number of locations to select
+        :return numpy.ndarray: indices of top locations, ascending by rating
     """
-    locations_ratings_np = np.array(locations_ratings)
-    locations_np = np.array(locations)
-    locations_sorted_np = locations_np[np.argsort(locations_ratings_np)]
-    return locations_sorted_np.tolist()
+    top_indices = np.argpartition(locations_rating, len(locations_rating) - count)[-count:]
+    return top_indices[np.argsort(locations_rating[top_indices], kind='stable')]
 
 
-def _best_rated_location(locations, locations_ratings):
+def _rate_locations(compiled_problem, locations, scoring_values, cache, rater):
     """
-    Get best rated location
-        :param list locations: list of locations
-        :param list locations_ratings: list of location ratings
-        :return dict: best location
+    Rate encoded locations in one batch
+        :param CompiledProblem compiled_problem: compiled problem
+        :param numpy.ndarray locations: encoded locations
+        :param dict scoring_values: dictionary of scoring values
+        :param FitnessCache cache: fitness cache or None
+        :param ParallelRater rater: worker pool or None
+        :return numpy.ndarray: location ratings
     """
-    locations_ratings_np = np.array(locations_ratings)
-    locations_np = np.array(locations)
-    locations_sorted_np = locations_np[np.argmax(locations_ratings_np)]
-    return locations_sorted_np
+    return rating.rate_encoded_locations(
+        compiled_problem, locations, scoring_values, cache, rater)
 
 
-def _location_search(problem, scoring_values, location, ngh, nsp, keep_og_locs):
+def _spawn_global_seekers(compiled_problem, scoring_values, n, rating_tools, rng):
     """
-    Perform location search
-        :param dict problem: problem dictionary
+    Spawn and rate encoded global seekers
+        :param CompiledProblem compiled_problem: compiled problem
+        :param dict scoring_values: dictionary of scoring values
+        :param int n: number of seekers
+        :param tuple rating_tools: fitness cache or None, worker pool or None and phase timer
+        :param numpy.random.Generator rng: random generator
+        :return tuple: encoded locations and their ratings
+    """
+    cache, rater, timer = rating_tools
+    started = timer.start()
+    locations = search.spawn_encoded_global_seekers(compiled_problem, n, rng)
+    started = timer.lap('global spawn', started)
+    locations_rating = _rate_locations(compiled_problem, locations, scoring_values, cache, rater)
+    timer.lap('rating', started)
+    return locations, locations_rating
+
+
+def _location_search(compiled_problem, scoring_values, location, ngh, nsp, keep_og_locs, rng):
+    """
+    Perform location search on encoded locations, rating seekers by score delta
+        :param CompiledProblem compiled_problem: compiled problem
         :param dict scoring_values: dictionary of scoring values
-        :param dict location: search starting point
+        :param numpy.ndarray location: encoded search starting point
         :param int ngh: neighbourhood size
         :param int nsp: neighbourhood search team size
         :param bool keep_og_locs: whether original locations should be kept in local searches
-        :return dict: best location found
+        :param numpy.random.Generator rng: random generator of search
+        :return numpy.ndarray: best encoded location found
     """
-    locations_local = search.spawn_local_seekers(problem, location, ngh, nsp)
-    if keep_og_locs:
-        locations_local.append(location)
-    locations_local_rating = rating.rate_locations(
-        locations_local, scoring_values)
+    location_breakdown = rating.rate_encoded_location_breakdown(
+        compiled_problem, location, scoring_values)
+    locations_local = search.spawn_encoded_local_seekers(
+        compiled_problem, location, ngh, nsp, rng)
+    locations_local_rating = rating.rate_encoded_local_locations(
+        compiled_problem, location, location_breakdown, locations_local, scoring_values)
 
-    locations_local_best = _best_rated_location(
-        locations_local, locations_local_rating)
+    best_index = int(np.argmax(locations_local_rating))
+    if keep_og_locs and rating.rate_location_breakdown(location_breakdown, scoring_values) \
+            > locations_local_rating[best_index]:
+        return location
 
-    return locations_local_best
+    return locations_local[best_index]
+
+
+def _site_searches(compiled_problem, scoring_values, locations, ngh, nsp, keep_og_locs, rng,
+                   rater):
+    """
+    Perform location searches of all sites, each with own random generator spawned from rng,
+    so results do not depend on whether searches run in worker processes
+        :param CompiledProblem compiled_problem: compiled problem
+        :param dict scoring_values: dictionary of scoring values
+        :param numpy.ndarray locations: encoded search starting points
+        :param int ngh: neighbourhood size
+        :param int nsp: neighbourhood search team size
+        :param bool keep_og_locs: whether original locations should be kept in local searches
+        :param numpy.random.Generator rng: random generator of round
+        :param ParallelRater rater: worker pool or None
+        :return numpy.ndarray: best encoded locations found
+    """
+    searches_args = [
+        (location, ngh, nsp, keep_og_locs, search_rng)
+        for location, search_rng in zip(locations, rng.spawn(len(locations)))]
+    if rater is not None:
+        search_results = rater.map_with_problem(_location_search, searches_args)
+    else:
+        search_results = [_location_search(compiled_problem, scoring_values, *search_args)
+                          for search_args in searches_args]
+    return np.array(search_results, dtype=locations.dtype).reshape(locations.shape)
+
+
+def _elite_and_standard_searches(compiled_problem, scoring_values, search_locations, e,
+                                 search_params, rng, rater):
+    """
+    Perform location searches of elite and standard sites
+        :param CompiledProblem compiled_problem: compiled problem
+        :param dict scoring_values: dictionary of scoring values
+        :param numpy.ndarray search_locations: encoded sites, ascending by rating
+        :param int e: elite neighbourhood search place count
+        :param tuple search_params: neighbourhood size, standard and elite search team sizes
+            and whether original locations should be kept in local searches
+        :param numpy.random.Generator rng: random generator of round
+        :param ParallelRater rater: worker pool or None
+        :return numpy.ndarray: best encoded locations found, elite sites first
+    """
+    ngh, nsp, nep, keep_og_locs = search_params
+    site_count = len(search_locations)
+    elite_search_locations = search_locations[site_count-e:]
+    standard_search_locations = search_locations[:site_count-e]
+
+    if e > 0:
+        elite_search_results = _site_searches(
+            compiled_problem, scoring_values, elite_search_locations, ngh, nep, keep_og_locs,
+            rng, rater)
+    else:
+        elite_search_results = elite_search_locations
+
+    standard_search_results = _site_searches(
+        compiled_problem, scoring_values, standard_search_locations, ngh, nsp, keep_og_locs,
+        rng, rater)
+
+    return np.concatenate((elite_search_results, standard_search_results))
+
+
+def _search_round(compiled_problem, scoring_values, locations, locations_rating, m, e,
+                  search_params, rating_tools, rng):
+    """
+    Search neighbourhoods of m top rated locations and rate search results
+        :param CompiledProblem compiled_problem: compiled problem
+        :param dict scoring_values: dictionary of scoring values
+        :param numpy.ndarray locations: encoded global locations
+        :param numpy.ndarray locations_rating: rating of global locations
+        :param int m: neighbourhood search place count
+        :param int e: elite neighbourhood search place count
+        :param tuple search_params: neighbourhood size, standard and elite search team sizes
+            and whether original locations should be kept in local searches
+        :param tuple rating_tools: fitness cache, worker pool and phase timer, cache and pool
+            may be None
+        :param numpy.random.Generator rng: random generator of round
+        :return tuple: best encoded locations found and their rating
+    """
+    cache, rater, timer = rating_tools
+    started = timer.start()
+    search_indices = _top_rated_indices(locations_rating, m)
+    started = timer.lap('ranking', started)
+
+    search_results = _elite_and_standard_searches(
+        compiled_problem, scoring_values, locations[search_indices], e, search_params, rng, rater)
+    started = timer.lap('local search', started)
+
+    search_ratings = _rate_locations(compiled_problem, search_results, scoring_values, cache,
+                                     rater)
+    timer.lap('rating', started)
+    return search_results, search_ratings
 
 
 def initialize(problem, scoring_values, stale_rounds, n, m, ngh, nsp, e=0,
-               nep=0, keep_og_locs=False):
+               nep=0, keep_og_locs=False, cache_size=0, workers=0, seed=None, time_phases=False,
+               verbose=False, callback=None, time_budget=None, max_evaluations=None,
+               target_score=None):
     """
     Launch bee algorithm
         :param dict problem: problem dictionary
         :param dict scoring_values: dictionary of scoring values
-        :param int stale_rounds: how much stale rounds has to pass
+        :param int stale_rounds: how much stale rounds has to pass, None disables it
         :param int n: seeker swarm size
         :param int m: neighbourhood search place count
         :param int ngh: neighbourhood size
@@ -73,6 +195,18 @@ def initialize(problem, scoring_values, stale_rounds, n, m, ngh, nsp, e=0,
         :param int e: elite neighbourhood search place count
         :param int nep: elite neighbourhood search team size
         :param bool keep_og_locs: whether original locations should be kept in local searches
+        :param int cache_size: max size of fitness cache, 0 disables caching
+        :param int workers: number of worker processes rating swarm and searching sites,
+            0 runs serially
+        :param seed: seed, numpy.random.SeedSequence or numpy.random.Generator of run,
+            run is not reproducible if not given
+        :param bool time_phases: whether to time spawning, local search, rating and ranking
+        :param bool verbose: whether print progress (at most once per second) during execution
+        :param callable callback: called with progress record of every round,
+            run stops early when it returns True
+        :param float time_budget: max run time in seconds (termination condition)
+        :param int max_evaluations: max number of rated solutions (termination condition)
+        :param float target_score: score run stops at when reached (termination condition)
     """
 
     # value assertions
@@ -82,62 +216,69 @@ def initialize(problem, scoring_values, stale_rounds, n, m, ngh, nsp, e=0,
         raise ValueError("ngh must be grater than 0")
 
     time_start = datetime.now()
+    rng = np.random.default_rng(seed)
+    # deadline is counted from here, so compilation is charged to time budget
+    termination = Termination(stale_rounds, time_budget, max_evaluations, target_score)
+    compiled_problem = CompiledProblem(problem)
+    termination.upper_bound = rating.location_score_upper_bound(compiled_problem, scoring_values)
+    cache = FitnessCache(cache_size) if cache_size > 0 else None
+    timer = PhaseTimer(time_phases)
+    recorder = ProgressRecorder([ConsoleReporter() if verbose else None, callback])
+    # solutions rated by every round: local seekers, search results and scouts
+    round_evaluations = (e * nep + (m - e) * nsp) + m + (n - m)
 
     # end condition set up
     best_score_so_far = -math.inf
     best_location_so_far = None
     rounds_wo_best_score_change = 0
     rounds_count = 0
+    termination_reason = None
+
+    with ParallelRater(compiled_problem, scoring_values, workers) if workers > 0 \
+            else nullcontext() as rater:
+        # spawn and rate n global seekers
+        locations_global, locations_global_rating = _spawn_global_seekers(
+            compiled_problem, scoring_values, n, (cache, rater, timer), rng)
+        evaluations = n
+
+        # main loop
+        while termination_reason is None:
+            rounds_count += 1
+
+            cummulative_search_results, cummulative_search_ratings = _search_round(
+                compiled_problem, scoring_values, locations_global, locations_global_rating, m, e,
+                (ngh, nsp, nep, keep_og_locs), (cache, rater, timer), rng)
+            started = timer.start()
+            round_best_index = int(np.argmax(cummulative_search_ratings))
+
+            if best_score_so_far < cummulative_search_ratings[round_best_index]:
+                best_score_so_far = cummulative_search_ratings[round_best_index]
+                best_location_so_far = cummulative_search_results[round_best_index].copy()
+                rounds_wo_best_score_change = 0
+            else:
+                rounds_wo_best_score_change += 1
+            timer.lap('ranking', started)
 
-    # spawn n global seekers
-    locations_global = search.spawn_global_seekers(problem, n)
-
-    # rate all found locations
-    locations_global_rating = rating.rate_locations(
-        locations_global, scoring_values)
-
-    # main loop
-    while rounds_wo_best_score_change < stale_rounds:
-        rounds_count += 1
-
-        locations_global_sorted = _sort_rated_locations(
-            locations_global, locations_global_rating)
-
-        elite_search_locations = locations_global_sorted[-e:]
-        if e > 0:
-            standard_search_locations = locations_global_sorted[:-e][-(m-e):]
-        else:
-            standard_search_locations = locations_global_sorted[-m:]
-
-        if e > 0:
-            elite_search_results = [_location_search(
-                problem, scoring_values, location, ngh, nep, keep_og_locs)
-                for location in elite_search_locations]
-        else:
-            elite_search_results = []
-        
-        standard_search_results = [_location_search(
-            problem, scoring_values, location, ngh, nsp, keep_og_locs)
-            for location in standard_search_locations]
-
-        cummulative_search_results = elite_search_results+standard_search_results
-        cummulative_search_ratings = rating.rate_locations(
-            cummulative_search_results, scoring_values)
-        round_best_location = _best_rated_location(
-            cummulative_search_results, cummulative_search_ratings)
-        round_best_rating = rating.rate_location(
-            round_best_location, scoring_values)
-
-        if best_score_so_far < round_best_rating:
-            best_score_so_far = round_best_rating
-            best_location_so_far = round_best_location
-            rounds_wo_best_score_change = 0
-        else:
-            rounds_wo_best_score_change += 1
-        locations_global = cummulative_search_results + \
-            search.spawn_global_seekers(problem, n-m)
+            locations_scouted, locations_scouted_rating = _spawn_global_seekers(
+                compiled_problem, scoring_values, n-m, (cache, rater, timer), rng)
+            locations_global = np.concatenate((cummulative_search_results, locations_scouted))
+            locations_global_rating = np.concatenate(
+                (cummulative_search_ratings, locations_scouted_rating))
+            timer.end_round()
+            evaluations += round_evaluations
+            if recorder.record(locations_global_rating,
+                               population_diversity(compiled_problem, locations_global),
+                               evaluations):
+                termination_reason = TerminationReasonEnum.Callback
+            else:
+                termination_reason = termination.reason(best_score_so_far,
+                                                        rounds_wo_best_score_change,
+                                                        evaluations + round_evaluations)
 
     time_end = datetime.now()
 
+    cache_hits, cache_misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
     return bee_algorithm_report.BeeAlgorithmReport(
-        best_location_so_far, best_score_so_far, rounds_count, time_end-time_start)
+        compiled_problem.decode_chromosome(best_location_so_far), best_score_so_far,
+        rounds_count, time_end-time_start, cache_hits, cache_misses, evaluations, timer,
+        recorder.records, termination_reason)
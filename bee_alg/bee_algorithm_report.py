@@ -17,17 +17,78 @@ class BeeAlgorithmReport(object):
     Run for {total_s} s.
     Completed {iteration_count} iterations.
     Achieved score of {score}.
+    Stopped by: {termination_reason}.
+    Fitness cache hits: {cache_hits}, misses: {cache_misses}.
+    Evaluated {evaluations} solutions ({evaluations_per_second:.0f}/s).
+    Phase times: {phase_times}.
     Result visualization:
     {res_vis}
+    Alternative groups: {alternatives}.
     Hash of solution:
     {hash}
     ===="""
 
-    def __init__(self, final_chromosome, score, generations, time_taken):
+    def __init__(self, final_chromosome, score, generations, time_taken,
+                 cache_hits=0, cache_misses=0, evaluations=0, phase_timer=None,
+                 progress=None, termination_reason=None):
         self.final_chromosome = final_chromosome
         self.score = score
         self.generations = generations
         self.time_taken = time_taken
+        self.cache_hits = cache_hits
+        self.cache_misses = cache_misses
+        self.evaluations = evaluations
+        self.phase_timer = phase_timer
+        # structured array of per generation records, see tui_gen.progress.RECORD_DTYPE
+        self.progress = progress
+        self.termination_reason = termination_reason
+
+    def evaluations_per_second(self):
+        """
+        Calculate evaluation rate of whole run.
+        :return float: evaluated solutions per second
+        """
+        total_s = self.time_taken.total_seconds()
+        return self.evaluations / total_s if total_s > 0 else 0.0
+
+    def _phase_times(self):
+        """
+        Format phase times.
+        :return str: phase totals or note on disabled timer
+        """
+        if self.phase_timer is None or not self.phase_timer.enabled:
+            return "not measured"
+        return self.phase_timer.summary()
+
+    def _termination_reason(self):
+        """
+        Format termination reason.
+        :return str: name of condition ending run
+        """
+        if self.termination_reason is None:
+            return "unknown"
+        return self.termination_reason.name
+
+    def alternatives(self):
+        """
+        List groups equivalent to chosen ones, see models.deduplicate_groups.
+        :return dict: dictionary of course name - list of names of chosen group and its
+            equivalents, for courses whose chosen group has any
+        """
+        return {course_name: [group.name] + group.equivalent_names
+                for course_name, group in self.final_chromosome.items()
+                if group.equivalent_names}
+
+    def _alternatives_summary(self):
+        """
+        Format groups equivalent to chosen ones.
+        :return str: chosen groups with their equivalents or note on their absence
+        """
+        alternatives = self.alternatives()
+        if not alternatives:
+            return "none"
+        return "; ".join("{}: {}".format(course_name, " = ".join(group_names))
+                         for course_name, group_names in alternatives.items())
 
     def printable_summary(self):
         """
@@ -52,5 +113,12 @@ class BeeAlgorithmReport(object):
         return self._SUMMARY_TEMPLATE.format(total_s=self.time_taken.total_seconds(),
                                              iteration_count=self.generations,
                                              score=self.score,
+                                             termination_reason=self._termination_reason(),
+                                             cache_hits=self.cache_hits,
+                                             cache_misses=self.cache_misses,
+                                             evaluations=self.evaluations,
+                                             evaluations_per_second=self.evaluations_per_second(),
+                                             phase_times=self._phase_times(),
                                              res_vis=res_vis,
+                                             alternatives=self._alternatives_summary(),
                                              hash=hash_hex)
@@ -3,9 +3,13 @@ Module containing rating part of bee algorithm solver
 """
 
 from copy import copy
-from datetime import datetime, timedelta
 
+from tui_gen.gen_alg.rating import rate_encoded_population, rate_encoded_breakdown, \
+    rate_encoded_delta, score_upper_bound, combine_breakdown
+from tui_gen.fitness_cache import FitnessCache
+from tui_gen.models import timeline
 from tui_gen.models.parity import Parity
+from tui_gen.models.timeline import DAY_COUNT
 
 _DEFAULT_CONFLICT_PENALTY = -250
 _DEFAULT_BEFORE_9_PENALTY = -10
@@ -16,11 +20,17 @@ _DEFAULT_FREE_DAY_BONUS = 50
 _DEFAULT_NOT_BEFORE_11_BONUS = 10
 _DEFAULT_NOT_AFTER_15_BONUS = 10
 
-_HOUR_9 = datetime(1900, 1, 1, 9, 0)
-_HOUR_11 = datetime(1900, 1, 1, 11, 0)
-_HOUR_15 = datetime(1900, 1, 1, 15, 0)
-_HOUR_17 = datetime(1900, 1, 1, 17, 0)
-_SPAN_2H = timedelta(hours=2)
+_MINUTE_9 = 9 * 60
+_MINUTE_11 = 11 * 60
+_MINUTE_15 = 15 * 60
+_MINUTE_17 = 17 * 60
+_MINUTE_24 = 24 * 60
+_MINUTES_2H = 2 * 60
+
+_BEFORE_9_MASK = timeline.day_range_mask(0, _MINUTE_9)
+_BEFORE_11_MASK = timeline.day_range_mask(0, _MINUTE_11)
+_AFTER_15_MASK = timeline.day_range_mask(_MINUTE_15 + 1, _MINUTE_24)
+_AFTER_17_MASK = timeline.day_range_mask(_MINUTE_17 + 1, _MINUTE_24)
 
 
 def create_fenotype(chromosome):
@@ -43,6 +53,34 @@ def create_fenotype(chromosome):
     return fenotype
 
 
+def create_minute_fenotype(location):
+    """
+    Create fenotype for rating with times given in minutes.
+    :param dict location: source location
+    :returns list: fenotype (list of list of tuples of (minute, minute))
+    """
+    fenotype = [[] for _ in range(DAY_COUNT)]
+    for group in location.values():
+        for day, minute_start, minute_end in group.activities():
+            fenotype[day].append((minute_start, minute_end, group.name))
+    for day_list in fenotype:
+        day_list.sort()
+
+    return fenotype
+
+
+def create_timeline(location):
+    """
+    Create timeline of activity starts for rating.
+    :param dict location: source location
+    :returns list: timeline (list of day masks of activity starts)
+    """
+    timeline_mask = 0
+    for group in location.values():
+        timeline_mask |= group.start_mask
+    return timeline.split_days(timeline_mask)
+
+
 def _count_conflicts(fenotype):
     """
     Count conflicts in fenotype.
@@ -62,100 +100,89 @@ def _count_conflicts(fenotype):
     return count
 
 
-def _count_before_9(fenotype):
+def _count_before_9(day_masks):
     """
     Count days with first activities before 9.
 
-    :param list fenotype: scored fenotype
+    :param list day_masks: scored timeline
     :return int: "before 9" occurances
     """
-    count = 0
-    for day_list in fenotype:
-        if day_list and day_list[0][0] < _HOUR_9:
-            count += 1
-    return count
+    return sum(1 for day_mask in day_masks if day_mask & _BEFORE_9_MASK)
 
 
-def _count_after_17(fenotype):
+def _count_after_17(day_masks):
     """
     Count days with last activities after 17.
 
-    :param list fenotype: scored fenotype
+    :param list day_masks: scored timeline
     :return int: "after 17" occurances
     """
-    count = 0
-    for day_list in fenotype:
-        if day_list and day_list[-1][0] > _HOUR_17:
-            count += 1
-    return count
+    return sum(1 for day_mask in day_masks if day_mask & _AFTER_17_MASK)
 
 
-def _count_not_before_11(fenotype):
+def _count_not_before_11(day_masks):
     """
     Count days with first activities not before 11.
 
-    :param list fenotype: scored fenotype
+    :param list day_masks: scored timeline
     :return int: "not before 11" occurances
     """
-    count = 0
-    for day_list in fenotype:
-        if day_list and day_list[0][0] >= _HOUR_11:
-            count += 1
-    return count
+    return sum(1 for day_mask in day_masks if day_mask and not day_mask & _BEFORE_11_MASK)
 
 
-def _count_not_after_15(fenotype):
+def _count_not_after_15(day_masks):
     """
     Count days with last activities not after 15.
 
-    :param list fenotype: scored fenotype
+    :param list day_masks: scored timeline
     :return int: "not after 15" occurances
     """
-    count = 0
-    for day_list in fenotype:
-        if day_list and day_list[-1][0] <= _HOUR_15:
-            count += 1
-    return count
+    return sum(1 for day_mask in day_masks if day_mask and not day_mask & _AFTER_15_MASK)
 
 
 def _count_2h_windows(fenotype):
     """
     Count 2h+ windows.
 
-    :param list fenotype: scored fenotype
+    :param list fenotype: scored minute fenotype
     :return int: 2h+ windows count
     """
     count = 0
     for day_list in fenotype:
         if len(day_list) > 2:
             for index in range(len(day_list) - 1):
-                if day_list[index+1][0] - day_list[index][1] >= _SPAN_2H:
+                if day_list[index+1][0] - day_list[index][1] >= _MINUTES_2H:
                     count += 1
     return count
 
 
-def _count_free_days(fenotype):
+def _count_free_days(day_masks):
     """
     Count free days.
 
-    :param list fenotype: scored fenotype
+    :param list day_masks: scored timeline
     :return int: free day count
     """
-    count = 0
-    for day_list in fenotype:
-        if not day_list:
-            count += 1
-    return count
+    return sum(1 for day_mask in day_masks if not day_mask)
 
 
-def rate_location(location, scoring_values):
+def rate_location(location, scoring_values, conflict_table=None, cache=None):
     """
     Calculate rating for location.
 
     :param dict location: location to score
     :param dict scoring_values: dictionary of scoring values
+    :param ConflictTable conflict_table: precomputed conflict table used instead of
+        counting conflicts in fenotype
+    :param FitnessCache cache: fitness cache to look score up in and store it to
     :returns int: score of location
     """
+    if cache is not None:
+        cache_key = FitnessCache.chromosome_key(location)
+        cached_score = cache.get(cache_key)
+        if cached_score is not None:
+            return cached_score
+
     conflict_penalty = scoring_values.get("conflictPenalty", _DEFAULT_CONFLICT_PENALTY)
     before_9_penalty = scoring_values.get("before9Penalty", _DEFAULT_BEFORE_9_PENALTY)
     after_17_penalty = scoring_values.get("after17Penalty", _DEFAULT_AFTER_17_PENALTY)
@@ -166,29 +193,107 @@ def rate_location(location, scoring_values):
     not_before_11_bonus = scoring_values.get("notBefore11Bonus", _DEFAULT_NOT_BEFORE_11_BONUS)
     not_after_15_bonus = scoring_values.get("notAfter15Bonus", _DEFAULT_NOT_AFTER_15_BONUS)
 
-    fenotype = create_fenotype(location)
+    fenotype = create_minute_fenotype(location)
+    day_masks = create_timeline(location)
 
-    score_conflict_penalty = conflict_penalty * _count_conflicts(fenotype)
-    score_before_9_penalty = before_9_penalty * _count_before_9(fenotype)
-    score_after_17_penalty = after_17_penalty * _count_after_17(fenotype)
+    if conflict_table is not None:
+        score_conflict_penalty = conflict_penalty * conflict_table.count_conflicts(location)
+    else:
+        score_conflict_penalty = conflict_penalty * _count_conflicts(fenotype)
+    score_before_9_penalty = before_9_penalty * _count_before_9(day_masks)
+    score_after_17_penalty = after_17_penalty * _count_after_17(day_masks)
     score_over_2h_window_penalty = over_2h_window_penalty * _count_2h_windows(fenotype)
 
-    score_free_day_bonus = free_day_bonus * _count_free_days(fenotype)
-    score_not_before_11_bonus = not_before_11_bonus * _count_not_before_11(fenotype)
-    score_not_after_15_bonus = not_after_15_bonus * _count_not_after_15(fenotype)
+    score_free_day_bonus = free_day_bonus * _count_free_days(day_masks)
+    score_not_before_11_bonus = not_before_11_bonus * _count_not_before_11(day_masks)
+    score_not_after_15_bonus = not_after_15_bonus * _count_not_after_15(day_masks)
 
     score = score_conflict_penalty + score_before_9_penalty + score_after_17_penalty + \
         score_over_2h_window_penalty + score_free_day_bonus + \
         score_not_before_11_bonus + score_not_after_15_bonus
 
+    if cache is not None:
+        cache.put(cache_key, score)
     return score
 
 
-def rate_locations(locations, scoring_values):
+def rate_locations(locations, scoring_values, conflict_table=None, cache=None):
     """
     Calculate rating for location list.
 
     :param list locations: locations to score
+    :param dict scoring_values: dictionary of scoring values
+    :param ConflictTable conflict_table: precomputed conflict table
+    :param FitnessCache cache: fitness cache
     :return list: list of scores
     """
-    return [rate_location(location, scoring_values) for location in locations]
+    return [rate_location(location, scoring_values, conflict_table, cache)
+            for location in locations]
+
+
+def rate_encoded_locations(problem, locations, scoring_values, cache=None, rater=None):
+    """
+    Calculate rating for whole encoded location matrix at once.
+
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray locations: encoded locations to score
+    :param dict scoring_values: dictionary of scoring values
+    :param FitnessCache cache: fitness cache
+    :param ParallelRater rater: worker pool rating locations instead of calling process
+    :return numpy.ndarray: array of scores
+    """
+    return rate_encoded_population(problem, locations, scoring_values, cache, rater)
+
+
+def rate_encoded_location_breakdown(problem, location, scoring_values):
+    """
+    Calculate score breakdown of encoded location, used as base of local searches.
+
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray location: encoded location
+    :param dict scoring_values: dictionary of scoring values
+    :return tuple: conflict counts per day and day scores of location
+    """
+    conflicts, day_scores = rate_encoded_breakdown(problem, location[None, :], scoring_values)
+    return conflicts[0], day_scores[0]
+
+
+def rate_location_breakdown(location_breakdown, scoring_values):
+    """
+    Calculate score of location from its breakdown, without rating it again.
+
+    :param tuple location_breakdown: conflict counts per day and day scores of location
+    :param dict scoring_values: dictionary of scoring values
+    :return float: score of location
+    """
+    conflicts, day_scores = location_breakdown
+    return combine_breakdown(conflicts, day_scores, scoring_values)
+
+
+def rate_encoded_local_locations(problem, location, location_breakdown, locations,
+                                 scoring_values):
+    """
+    Calculate rating for encoded locations found around single location.
+    Only parts of score touched by changed dimensions are recomputed.
+
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray location: encoded search starting point
+    :param tuple location_breakdown: conflict counts per day and day scores of starting point
+    :param numpy.ndarray locations: encoded locations to score
+    :param dict scoring_values: dictionary of scoring values
+    :return numpy.ndarray: array of scores
+    """
+    conflicts, day_scores = location_breakdown
+    return rate_encoded_delta(
+        problem, location, conflicts, day_scores, locations, scoring_values)[0]
+
+
+def location_score_upper_bound(problem, scoring_values):
+    """
+    Calculate upper bound of score of any location of problem.
+
+    :param CompiledProblem problem: compiled problem
+    :param dict scoring_values: dictionary of scoring values
+    :return float: upper bound of score, infinity if any penalty is positive
+    """
+    return score_upper_bound(problem, scoring_values)
@@ -1,55 +1,103 @@
 """
 Module containing search part of bee algorithm solver
 """
-from random import choice as rand_choice, choices as rand_choices
 from copy import copy
 
+import numpy as np
 
-def spawn_global_seeker(problem_dict):
+
+def spawn_global_seeker(problem_dict, rng=None):
     """
     Create random global seeker
     :param dict problem_dict: problem dictionary
+    :param numpy.random.Generator rng: random generator, fresh one if not given
     :returns dict: randomly created seeker
     """
+    rng = np.random.default_rng(rng)
     return {
-        course_name: rand_choice(group_list) for course_name, group_list in problem_dict.items()
+        course_name: group_list[rng.integers(len(group_list))]
+        for course_name, group_list in problem_dict.items()
     }
 
 
-def spawn_global_seekers(problem, n):
+def spawn_global_seekers(problem, n, rng=None):
     """
     Spawn n global seekers
         :param dict problem: problem dictionary
         :param int n: seeker count
+        :param numpy.random.Generator rng: random generator, fresh one if not given
         :return list: global seekers, list of dict
     """
-    return [spawn_global_seeker(problem) for _ in range(n)]
+    rng = np.random.default_rng(rng)
+    return [spawn_global_seeker(problem, rng) for _ in range(n)]
+
+
+def spawn_encoded_global_seekers(problem, n, rng=None):
+    """
+    Spawn n encoded global seekers
+        :param CompiledProblem problem: compiled problem
+        :param int n: seeker count
+        :param numpy.random.Generator rng: random generator, fresh one if not given
+        :return numpy.ndarray: encoded global seekers, (n, course_count)
+    """
+    return problem.random_population(n, rng)
 
 
-def spawn_local_seeker(problem, location, ngh):
+def spawn_local_seeker(problem, location, ngh, rng=None):
     """
     Create random global seeker
     :param dict problem: problem dictionary
     :param dict location: location to spawn seeker at
     :param int ngh: neighbourhood size
+    :param numpy.random.Generator rng: random generator, fresh one if not given
     :returns dict: randomly created seeker
     """
+    rng = np.random.default_rng(rng)
     key_list = list(problem.keys())
-    changed_dimensions_count = rand_choice(list(range(1, ngh+1)))
-    changed_dimensions = rand_choices(key_list, k=changed_dimensions_count)
+    changed_dimensions_count = rng.integers(1, ngh+1)
+    changed_dimensions = [key_list[key_index] for key_index in
+                          rng.integers(len(key_list), size=changed_dimensions_count).tolist()]
     new_location = copy(location)
     for changed_dimension in changed_dimensions:
-        new_location[changed_dimension] = rand_choice(
-            problem[changed_dimension])
+        group_list = problem[changed_dimension]
+        new_location[changed_dimension] = group_list[rng.integers(len(group_list))]
     return new_location
 
 
-def spawn_local_seekers(problem, location, ngh, n):
+def spawn_local_seekers(problem, location, ngh, n, rng=None):
     """
     Create random global seeker
     :param dict problem: problem dictionary
     :param dict location: location to spawn seeker at
     :param int ngh: neighbourhood size
+    :param numpy.random.Generator rng: random generator, fresh one if not given
     :returns list: list of randomly created seekers
     """
-    return [spawn_local_seeker(problem, location, ngh) for _ in range(n)]
+    rng = np.random.default_rng(rng)
+    return [spawn_local_seeker(problem, location, ngh, rng) for _ in range(n)]
+
+
+def spawn_encoded_local_seekers(problem, location, ngh, n, rng=None):
+    """
+    Create n random local seekers around encoded location
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray location: encoded location to spawn seekers at
+    :param int ngh: neighbourhood size
+    :param int n: seeker count
+    :param numpy.random.Generator rng: random generator, fresh one if not given
+    :returns numpy.ndarray: encoded seekers, (n, course_count)
+    """
+    rng = np.random.default_rng(rng)
+    seekers = np.repeat(location[None, :], n, axis=0)
+    if len(problem.free_courses) == 0:
+        return seekers
+    # only courses with alternative groups are searched
+    changed_dimensions_counts = rng.integers(1, ngh + 1, size=n)
+    changed_dimensions = problem.free_courses[
+        rng.integers(0, len(problem.free_courses), size=(n, ngh))]
+    new_groups = rng.integers(0, problem.group_counts[changed_dimensions])
+    applied = np.arange(ngh) < changed_dimensions_counts[:, None]
+
+    seeker_indices = np.repeat(np.arange(n)[:, None], ngh, axis=1)
+    seekers[seeker_indices[applied], changed_dimensions[applied]] = new_groups[applied]
+    return seekers
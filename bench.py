@@ -0,0 +1,150 @@
+"""
+Micro-benchmarks of solver hot paths on problems of increasing size.
+
+Results are written to JSON file (seconds per call, best of repeats) and, when
+baseline file is given, compared against it. Benchmarks slower than baseline by
+more than threshold are reported and make script exit with status 1.
+
+    python bench.py --output bench.json --baseline bench_baseline.json
+"""
+import argparse
+import sys
+import timeit
+import numpy as np
+
+from common import load_json, save_json
+from gen import generate_courses
+from tui_gen.models import parse_raw_course_dict
+from tui_gen.models.compiled_problem import CompiledProblem
+from tui_gen import gen_alg
+from tui_gen.gen_alg import rating as gen_rating
+from bee_alg import rating as bee_rating, search
+
+COURSE_COUNTS = [10, 50, 200]
+GROUPS_PER_COURSE = 4
+PERIODS_PER_GROUP = 2
+POP_SIZE = 100
+PARITY_RATIO = 0.3
+CONFLICT_DENSITY = 0.05
+
+
+def benchmark_cases(problem_dict, rng):
+    """
+    Create benchmark cases on problem.
+    :param dict problem_dict: problem dictionary
+    :param numpy.random.Generator rng: random generator shared by cases
+    :returns dict: benchmark functions by name
+    """
+    compiled_problem = CompiledProblem(problem_dict)
+    population = gen_alg.create_population(problem_dict, POP_SIZE, rng)
+    encoded_population = compiled_problem.encode_population(population)
+    population_rating = np.array(gen_rating.rate_population(population, {}))
+    chromosome = population[0]
+    neighbours, changed = compiled_problem.course_neighbours(
+        encoded_population[0], compiled_problem.free_courses)
+    conflicts, day_scores = gen_rating.rate_encoded_breakdown(
+        compiled_problem, encoded_population[:1], {})
+    return {
+        'create_fenotype': lambda: gen_rating.create_fenotype(chromosome),
+        'rate_chromosome': lambda: gen_rating.rate_chromosome(chromosome, {}),
+        'rate_location': lambda: bee_rating.rate_location(chromosome, {}),
+        'rate_encoded_population': lambda: gen_rating.rate_encoded_population(
+            compiled_problem, encoded_population, {}),
+        'rate_encoded_neighbours': lambda: gen_rating.rate_encoded_population(
+            compiled_problem, neighbours, {}),
+        'rate_encoded_neighbours_delta': lambda: gen_rating.rate_encoded_delta(
+            compiled_problem, encoded_population[0], conflicts[0], day_scores[0], neighbours, {},
+            changed),
+        'population_crossover': lambda: gen_alg.population_crossover(
+            population, 0.7, rng=rng),
+        'encoded_population_crossover': lambda: gen_alg.encoded_population_crossover(
+            encoded_population, 0.7, rng=rng),
+        'population_mutation': lambda: gen_alg.population_mutation(
+            population, problem_dict, 0.1, gen_alg.MutationMethodEnum.Range, rng),
+        'encoded_population_mutation': lambda: gen_alg.encoded_population_mutation(
+            encoded_population, compiled_problem, 0.1, gen_alg.MutationMethodEnum.Range, rng),
+        'tournament_selection': lambda: gen_alg.tournament_selection(
+            population, population_rating, rng=rng),
+        'encoded_tournament_selection': lambda: gen_alg.encoded_tournament_selection(
+            encoded_population, population_rating, rng=rng),
+        'roulette_selection': lambda: gen_alg.roulette_selection(
+            population, population_rating - population_rating.max(), rng=rng),
+        'spawn_local_seekers': lambda: search.spawn_local_seekers(
+            problem_dict, chromosome, 2, POP_SIZE, rng),
+        'spawn_encoded_local_seekers': lambda: search.spawn_encoded_local_seekers(
+            compiled_problem, encoded_population[0], 2, POP_SIZE, rng),
+    }
+
+
+def run_benchmarks(course_counts, repeats, selected_names):
+    """
+    Run benchmarks on generated problems and print their times.
+    :param list course_counts: course counts of benchmark problems
+    :param int repeats: timing repeats per benchmark
+    :param set selected_names: names of benchmarks to run, all if empty
+    :returns dict: seconds per call by benchmark name and course count
+    """
+    results = {}
+    for course_count in course_counts:
+        problem_dict = parse_raw_course_dict({'courses': dict(generate_courses(
+            course_count, GROUPS_PER_COURSE, PERIODS_PER_GROUP, PARITY_RATIO, CONFLICT_DENSITY,
+            seed=0))})
+        cases = benchmark_cases(problem_dict, np.random.default_rng(0))
+        for name, case in cases.items():
+            if selected_names and name not in selected_names:
+                continue
+            timer = timeit.Timer(case)
+            number, _ = timer.autorange()
+            seconds = min(timer.repeat(repeats, number)) / number
+            results["{}[{}]".format(name, course_count)] = seconds
+            print("{:<45}{:>12.6f} ms".format("{}[{}]".format(name, course_count), seconds * 1e3))
+    return results
+
+
+def find_regressions(results, baseline, threshold):
+    """
+    Find benchmarks slower than baseline.
+    :param dict results: seconds per call by benchmark key
+    :param dict baseline: baseline seconds per call by benchmark key
+    :param float threshold: allowed relative slowdown
+    :returns list: tuples of (key, baseline seconds, seconds) of regressions
+    """
+    regressions = []
+    for key, seconds in sorted(results.items()):
+        baseline_seconds = baseline.get(key)
+        if baseline_seconds and seconds > baseline_seconds * (1 + threshold):
+            regressions.append((key, baseline_seconds, seconds))
+    return regressions
+
+
+def main():
+    """
+    Run benchmarks, save results and compare them against baseline.
+    """
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of solver hot paths")
+    parser.add_argument('--output', default='bench.json', help="JSON file to write results to")
+    parser.add_argument('--baseline', help="JSON file of results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="allowed relative slowdown against baseline")
+    parser.add_argument('--repeats', type=int, default=5, help="timing repeats per benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=COURSE_COUNTS,
+                        help="course counts of benchmark problems")
+    parser.add_argument('--only', nargs='+', default=[], help="names of benchmarks to run")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.repeats, set(args.only))
+    save_json(args.output, {'results': results})
+
+    if args.baseline:
+        baseline = load_json(args.baseline)['results']
+        regressions = find_regressions(results, baseline, args.threshold)
+        for key, baseline_seconds, seconds in regressions:
+            print("REGRESSION {}: {:.6f} ms -> {:.6f} ms ({:+.0%})".format(
+                key, baseline_seconds * 1e3, seconds * 1e3, seconds / baseline_seconds - 1))
+        if regressions:
+            sys.exit(1)
+        print("No regressions over {:.0%} against {}.".format(args.threshold, args.baseline))
+
+
+if __name__ == "__main__":
+    main()
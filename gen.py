@@ -1,26 +1,117 @@
+"""
+Synthetic problem generator for scaling tests and benchmarks.
+
+Every period starts in one of time slots of the week grid. Conflict density is
+expected share of period pairs of different groups that overlap; it is reached by
+limiting number of grid cells periods are placed in (densities lower than full grid
+gives are clamped to full grid). Output is streamed course by course, so very
+large problems are never held in memory.
+
+    python gen.py --courses 1000 --groups 5 --periods 2 --parity 0.3 --density 0.05 \\
+        --seed 1 --output artifacts/gen1000.json
+"""
+import argparse
 import json
-from random import choice
+import sys
+from random import Random
+
 times = [("0730", "0900"), ("0915", "1100"), ("1115", "1300"), ("1315", "1500"),
          ("1515", "1655"), ("1705", "1845"), ("1855", "2035")]
 dows = list(range(1, 6))
-pars = [1,2]
+pars = [1, 2]
+
+
+def grid_cells(density, parity_ratio, rand):
+    """
+    Choose grid cells periods are placed in, so periods overlap with target density.
+    :param float density: target share of overlapping period pairs
+    :param float parity_ratio: share of periods taking place every other week
+    :param random.Random rand: random generator
+    :returns list: tuples of (dow, (start, end)) of chosen cells
+    """
+    # single week periods of different parity never overlap
+    overlap_prob = 1 - parity_ratio ** 2 / 2
+    all_cells = [(dow, time) for dow in dows for time in times]
+    rand.shuffle(all_cells)
+    cell_count = round(overlap_prob / density) if density > 0 else len(all_cells)
+    return all_cells[:min(len(all_cells), max(1, cell_count))]
 
 
+def generate_period(cells, parity_ratio, rand):
+    """
+    Generate raw period in one of grid cells.
+    :param list cells: grid cells to choose from, see grid_cells
+    :param float parity_ratio: share of periods taking place every other week
+    :param random.Random rand: random generator
+    :returns dict: raw period
+    """
+    dow, (start, end) = rand.choice(cells)
+    period = {"start": start, "end": end, "dow": dow}
+    if rand.random() < parity_ratio:
+        period["par"] = rand.choice(pars)
+    return period
 
-def s1():
-    start, end = choice(times)
-    return{"start": start, "end": end, "dow": choice(dows)}
 
+def generate_courses(course_count, group_count, period_count, parity_ratio=0.0, density=0.05,
+                     seed=None):
+    """
+    Generate raw courses one by one.
+    :param int course_count: course count
+    :param int group_count: groups per course
+    :param int period_count: periods per group
+    :param float parity_ratio: share of periods taking place every other week
+    :param float density: target share of overlapping period pairs
+    :param seed: random seed, problem is not reproducible if not given
+    :returns generator: tuples of (course name, raw groups dictionary)
+    """
+    rand = Random(seed)
+    cells = grid_cells(density, parity_ratio, rand)
+    for course_index in range(1, course_count + 1):
+        groups = {}
+        for group_index in range(1, group_count + 1):
+            groups["O{}_{}".format(course_index, group_index)] = [
+                generate_period(cells, parity_ratio, rand) for _ in range(period_count)]
+        yield "K{}".format(course_index), groups
+
+
+def write_problem(stream, courses):
+    """
+    Write raw problem as JSON, course by course.
+    :param stream: text stream to write to
+    :param iterable courses: tuples of (course name, raw groups dictionary)
+    """
+    stream.write('{"courses": {')
+    for course_index, (course_name, groups) in enumerate(courses):
+        if course_index:
+            stream.write(',')
+        stream.write('\n{}: {}'.format(json.dumps(course_name), json.dumps(groups)))
+    stream.write('\n}}\n')
 
-def s2():
-    start, end = choice(times)
-    return {"start": start, "end": end, "dow": choice(dows), "par": choice(pars)}
 
 def main():
-    acc = {}
-    for i in range(1,3):
-        acc["O{}".format(i)] = [s1()]
-    print(json.dumps(acc))
+    """
+    Generate problem given by command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Synthetic problem generator")
+    parser.add_argument('--courses', type=int, default=10, help="course count")
+    parser.add_argument('--groups', type=int, default=3, help="groups per course")
+    parser.add_argument('--periods', type=int, default=1, help="periods per group")
+    parser.add_argument('--parity', type=float, default=0.0,
+                        help="share of periods taking place every other week")
+    parser.add_argument('--density', type=float, default=0.05,
+                        help="target share of overlapping period pairs")
+    parser.add_argument('--seed', type=int, help="random seed")
+    parser.add_argument('--output', help="problem file, standard output if not given")
+    args = parser.parse_args()
+
+    courses = generate_courses(args.courses, args.groups, args.periods, args.parity,
+                               args.density, args.seed)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            write_problem(output_file, courses)
+    else:
+        write_problem(sys.stdout, courses)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,62 @@
+"""
+Module containing small random problems for tests.
+"""
+import itertools
+from random import Random
+
+import numpy as np
+
+from tui_gen.models import parse_raw_course_dict
+
+SCORING_VALUES = [
+    {},
+    {"conflictPenalty": -7, "before9Penalty": -3, "after17Penalty": -2,
+     "over2hWindowPenalty": -5, "freeDayBonus": 11, "notBefore11Bonus": 13,
+     "notAfter15Bonus": 17},
+]
+
+
+def _random_period(rand):
+    start = rand.randrange(7 * 60, 20 * 60)
+    end = min(start + rand.choice([0, 30, 45, 90, 95, 100, 200]), 23 * 60 + 59)
+    period = {"start": "%02d%02d" % divmod(start, 60), "end": "%02d%02d" % divmod(end, 60),
+              "dow": rand.randint(1, 5)}
+    if rand.random() < 0.4:
+        period["par"] = rand.choice([0, 1, 2])
+    return period
+
+
+def random_raw_problem(seed, course_count, max_groups=4, max_periods=3):
+    """
+    Create random raw problem, periods start at any minute of the day.
+    :param int seed: random seed
+    :param int course_count: number of courses
+    :param int max_groups: max number of groups of course
+    :param int max_periods: max number of periods of group
+    :returns dict: raw, json-like problem
+    """
+    rand = Random(seed)
+    return {"courses": {
+        "C{}".format(course_index): {
+            "G{}_{}".format(course_index, group_index): [
+                _random_period(rand) for _ in range(rand.randint(0, max_periods))]
+            for group_index in range(rand.randint(1, max_groups))}
+        for course_index in range(course_count)}}
+
+
+def random_problem(seed, course_count, max_groups=4, max_periods=3):
+    """
+    Create random problem dictionary, see random_raw_problem.
+    :returns dict: problem dictionary
+    """
+    return parse_raw_course_dict(random_raw_problem(seed, course_count, max_groups, max_periods))
+
+
+def all_chromosomes(problem):
+    """
+    Enumerate every encoded chromosome of problem.
+    :param CompiledProblem problem: compiled problem
+    :returns numpy.ndarray: encoded population of all chromosomes
+    """
+    return np.array(list(itertools.product(*(range(count) for count in problem.group_counts))),
+                    dtype=np.int64).reshape(-1, problem.course_count)
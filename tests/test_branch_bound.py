@@ -0,0 +1,31 @@
+"""
+Tests of branch and bound against enumeration of all chromosomes.
+"""
+import pytest
+
+from tests.problems import SCORING_VALUES, all_chromosomes, random_problem
+from tui_gen.branch_bound import branch_and_bound
+from tui_gen.gen_alg.rating import rate_chromosome, rate_encoded_population
+from tui_gen.models.compiled_problem import CompiledProblem
+
+
+@pytest.mark.parametrize("scoring_values", SCORING_VALUES)
+@pytest.mark.parametrize("seed", range(40))
+def test_branch_and_bound_is_optimal(seed, scoring_values):
+    problem_dict = random_problem(seed, 1 + seed % 7)
+    problem = CompiledProblem(problem_dict)
+    best_score = rate_encoded_population(problem, all_chromosomes(problem), scoring_values).max()
+
+    report = branch_and_bound(problem_dict, scoring_values)
+    assert report.optimal
+    assert report.score == best_score
+    assert rate_chromosome(report.final_chromosome, scoring_values) == best_score
+
+
+def test_branch_and_bound_rejects_invalid_problems():
+    with pytest.raises(ValueError):
+        branch_and_bound(random_problem(0, 3), {"after17Penalty": 5})
+    problem_dict = random_problem(0, 3)
+    problem_dict["empty"] = []
+    with pytest.raises(ValueError):
+        branch_and_bound(problem_dict, {})
@@ -0,0 +1,37 @@
+"""
+Tests of conflict table against conflicts counted by encoded rating.
+"""
+import numpy as np
+import pytest
+
+from tests.problems import random_problem
+from tui_gen.gen_alg.rating import rate_encoded_breakdown
+from tui_gen.models.compiled_problem import CompiledProblem
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_count_encoded_conflicts(seed):
+    problem = CompiledProblem(random_problem(seed, 1 + seed % 12))
+    population = problem.random_population(30, seed)
+    expected = rate_encoded_breakdown(problem, population, {})[0].sum(axis=1)
+
+    group_indices = problem.global_group_indices(population)
+    np.testing.assert_array_equal(
+        problem.conflict_table.count_encoded_conflicts(group_indices), expected)
+    assert [problem.conflict_table.count_conflicts(chromo)
+            for chromo in problem.decode_population(population)] == expected.tolist()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_rows(seed):
+    problem = CompiledProblem(random_problem(seed, 2))
+    table = problem.conflict_table.rows(np.arange(problem.group_count))
+    np.testing.assert_array_equal(table, table.T)
+    np.testing.assert_array_equal(np.diag(table), problem.conflict_table.diagonal)
+
+    for group_0 in range(problem.group_count):
+        for group_1 in range(group_0 + 1, problem.group_count):
+            pair = np.array([[group_0, group_1]])
+            # conflicts of pair without conflicts inside its groups
+            assert problem.conflict_table.count_encoded_conflicts(pair)[0] \
+                - table[group_0, group_0] - table[group_1, group_1] == table[group_0, group_1]
@@ -0,0 +1,39 @@
+"""
+Tests of genetic algorithm termination and encoded operators.
+"""
+import numpy as np
+import pytest
+
+from tests.problems import random_problem
+from tui_gen.gen_alg import CrossoverMethodEnum, LocalSearchMethodEnum, \
+    encoded_population_crossover, genetic_algorithm
+from tui_gen.models.compiled_problem import CompiledProblem
+
+
+@pytest.mark.parametrize("local_search_interval", [0, 1, 3])
+@pytest.mark.parametrize("local_search", list(LocalSearchMethodEnum))
+@pytest.mark.parametrize("max_evaluations", [60, 517, 2000])
+def test_polishing_keeps_evaluation_budget(max_evaluations, local_search, local_search_interval):
+    report = genetic_algorithm(random_problem(1, 12), 30, 0.8, 0.1, None, {}, verbose=False,
+                               seed=0, max_evaluations=max_evaluations, local_search=local_search,
+                               local_search_interval=local_search_interval, local_search_size=3)
+    assert report.evaluations <= max_evaluations
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_classy_crossover_splits_sorted_course_names(seed):
+    problem_dict = random_problem(seed, 12)
+    problem = CompiledProblem({course_name: problem_dict[course_name]
+                               for course_name in reversed(sorted(problem_dict))})
+    population = problem.random_population(40, seed)
+    offspring = encoded_population_crossover(population, 1.0, CrossoverMethodEnum.Classy, 1,
+                                             rng=seed, course_order=problem.sorted_course_order)
+    parents = population[np.random.default_rng(seed).permutation(len(population))]
+    order = problem.sorted_course_order
+    for pair_index in range(len(population) // 2):
+        parent_0, parent_1 = parents[2 * pair_index][order], parents[2 * pair_index + 1][order]
+        child = offspring[2 * pair_index][order]
+        differing = parent_0 != parent_1
+        from_parent_1 = (child != parent_0)[differing]
+        # one cross point: genes of sorted courses come from one parent, then the other
+        assert np.count_nonzero(np.diff(from_parent_1.astype(np.int64))) <= 1
@@ -0,0 +1,69 @@
+"""
+Tests of parsing, deduplicating and locking problems.
+"""
+import pytest
+
+from tests.problems import random_raw_problem
+from tui_gen.models import lock_groups, parse_raw_course_dict
+from tui_gen.models.compiled_problem import CompiledProblem
+from tui_gen.models.conflict_table import ConflictTable
+
+
+def _conflicts(group_0, group_1):
+    """
+    Count conflicts between two groups the way rating does.
+    """
+    return ConflictTable([group_0, group_1]).count_conflicts({"a": group_0, "b": group_1}) \
+        - ConflictTable([group_0]).count_conflicts({"a": group_0}) \
+        - ConflictTable([group_1]).count_conflicts({"b": group_1})
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_lock_prunes_conflicting_groups(seed):
+    problem_dict = parse_raw_course_dict(random_raw_problem(seed, 6))
+    locked_groups = {course_name: group_list[-1].name
+                     for course_name, group_list in list(problem_dict.items())[:2]}
+    locked_dict = lock_groups(problem_dict, locked_groups)
+
+    for course_name, group_name in locked_groups.items():
+        assert [group.name for group in locked_dict[course_name]] == [group_name]
+    pinned_groups = [group_list[0] for group_list in locked_dict.values()
+                     if len(group_list) == 1]
+    for course_name, group_list in locked_dict.items():
+        assert group_list and set(group_list) <= set(problem_dict[course_name])
+        # only groups conflicting with some pinned group are dropped
+        if course_name not in locked_groups:
+            for group in set(problem_dict[course_name]) - set(group_list):
+                assert any(_conflicts(group, pinned) for pinned in pinned_groups)
+
+
+def test_lock_keeps_groups_rating_does_not_count_as_conflicting():
+    raw_problem = {"courses": {
+        "A": {"A1": [{"start": "0800", "end": "1200", "dow": 1}]},
+        "B": {"B1": [{"start": "0900", "end": "1000", "dow": 1}],
+              "B2": [{"start": "1100", "end": "1300", "dow": 1}],
+              "B3": [{"start": "1400", "end": "1500", "dow": 1}]}},
+                   "locked": {"A": "A1"}}
+    problem_dict = parse_raw_course_dict(raw_problem)
+    # period contained in pinned one is not counted as conflict by rating
+    assert [group.name for group in problem_dict["B"]] == ["B1", "B3"]
+    assert CompiledProblem(problem_dict).course_count == 2
+
+
+def test_lock_by_equivalent_name_after_deduplication():
+    period_list = [{"start": "0800", "end": "0930", "dow": 2}]
+    raw_problem = {"courses": {
+        "A": {"A1": period_list, "A2": period_list,
+              "A3": [{"start": "1000", "end": "1130", "dow": 3}]}},
+                   "locked": {"A": "A2"}}
+    problem_dict = parse_raw_course_dict(raw_problem, deduplicate=True)
+    assert len(problem_dict["A"]) == 1
+    assert [problem_dict["A"][0].name] + problem_dict["A"][0].equivalent_names == ["A1", "A2"]
+
+
+def test_lock_unknown_group():
+    problem_dict = parse_raw_course_dict(random_raw_problem(0, 2))
+    with pytest.raises(ValueError):
+        lock_groups(problem_dict, {"C0": "missing"})
+    with pytest.raises(ValueError):
+        lock_groups(problem_dict, {"missing": "G0_0"})
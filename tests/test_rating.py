@@ -0,0 +1,72 @@
+"""
+Tests of encoded rating against rating of decoded chromosomes.
+"""
+import numpy as np
+import pytest
+
+from tests.problems import SCORING_VALUES, all_chromosomes, random_problem
+from tui_gen.gen_alg import rating
+from tui_gen.gen_alg.rating import rate_encoded_breakdown, rate_encoded_delta, \
+    rate_encoded_population, rate_population, score_upper_bound
+from tui_gen.models.compiled_problem import CompiledProblem
+
+
+@pytest.mark.parametrize("scoring_values", SCORING_VALUES)
+@pytest.mark.parametrize("seed", range(40))
+def test_encoded_population_rating(seed, scoring_values):
+    problem = CompiledProblem(random_problem(seed, 1 + seed % 12))
+    population = problem.random_population(30, seed)
+
+    expected = rate_population(problem.decode_population(population), scoring_values)
+    np.testing.assert_array_equal(
+        rate_encoded_population(problem, population, scoring_values), expected)
+    np.testing.assert_array_equal(
+        rate_population(problem.decode_population(population), scoring_values,
+                        problem.conflict_table), expected)
+
+
+@pytest.mark.parametrize("min_delta_activities", [0, 8192])
+@pytest.mark.parametrize("scoring_values", SCORING_VALUES)
+@pytest.mark.parametrize("seed", range(40))
+def test_delta_rating(monkeypatch, seed, scoring_values, min_delta_activities):
+    monkeypatch.setattr(rating, "_MIN_DELTA_ACTIVITIES", min_delta_activities)
+    problem = CompiledProblem(random_problem(seed, 1 + seed % 12))
+    rng = np.random.default_rng(seed)
+    parents = problem.random_population(20, rng)
+    children = np.where(rng.random(parents.shape) < 0.3,
+                        problem.random_population(20, rng), parents)
+    conflicts, day_scores = rate_encoded_breakdown(problem, parents, scoring_values)
+    expected = rate_encoded_population(problem, children, scoring_values)
+
+    scores, child_conflicts, _ = rate_encoded_delta(
+        problem, parents, conflicts, day_scores, children, scoring_values)
+    np.testing.assert_array_equal(scores, expected)
+    np.testing.assert_array_equal(
+        child_conflicts, rate_encoded_breakdown(problem, children, scoring_values)[0])
+
+    children[:] = np.where(children != parents, children, parents[0])
+    scores = rate_encoded_delta(problem, parents[0], conflicts[0], day_scores[0], children,
+                                scoring_values)[0]
+    np.testing.assert_array_equal(
+        scores, rate_encoded_population(problem, children, scoring_values))
+
+    neighbours, changed = problem.course_neighbours(parents[0], np.arange(problem.course_count))
+    # genes marked changed but equal to parent ones are rated the same
+    changed |= rng.random(changed.shape) < 0.2
+    scores = rate_encoded_delta(problem, parents[0], conflicts[0], day_scores[0], neighbours,
+                                scoring_values, changed)[0]
+    np.testing.assert_array_equal(
+        scores, rate_encoded_population(problem, neighbours, scoring_values))
+
+
+@pytest.mark.parametrize("scoring_values", SCORING_VALUES)
+@pytest.mark.parametrize("seed", range(40))
+def test_score_upper_bound(seed, scoring_values):
+    problem = CompiledProblem(random_problem(seed, 1 + seed % 5))
+    best_score = rate_encoded_population(problem, all_chromosomes(problem), scoring_values).max()
+    assert best_score <= score_upper_bound(problem, scoring_values)
+
+
+def test_score_upper_bound_of_positive_penalty():
+    problem = CompiledProblem(random_problem(0, 3))
+    assert score_upper_bound(problem, {"before9Penalty": 1}) == float('inf')
@@ -0,0 +1,54 @@
+"""
+Tests of tabu search moves.
+"""
+import numpy as np
+import pytest
+
+import tui_gen.tabu_search as tabu_module
+from tests.problems import random_problem
+from tui_gen.models.compiled_problem import CompiledProblem
+
+
+@pytest.mark.parametrize("tenure", [1, 2, 3])
+@pytest.mark.parametrize("seed", range(3))
+def test_moved_course_is_tabu_for_tenure_iterations(monkeypatch, seed, tenure):
+    initial_scores, changed_masks, choices = [], [], []
+    choose_move = tabu_module._choose_move
+    combine_breakdown = tabu_module.combine_breakdown
+    course_neighbours = CompiledProblem.course_neighbours
+
+    def spy_combine_breakdown(*args):
+        scores = combine_breakdown(*args)
+        initial_scores.append(scores[0])
+        return scores
+
+    def spy_course_neighbours(self, *args):
+        neighbours, changed = course_neighbours(self, *args)
+        changed_masks.append(changed)
+        return neighbours, changed
+
+    def spy_choose_move(scores, allowed, rng):
+        move_index = choose_move(scores, allowed, rng)
+        choices.append((scores, allowed, move_index))
+        return move_index
+
+    monkeypatch.setattr(tabu_module, "combine_breakdown", spy_combine_breakdown)
+    monkeypatch.setattr(CompiledProblem, "course_neighbours", spy_course_neighbours)
+    monkeypatch.setattr(tabu_module, "_choose_move", spy_choose_move)
+    tabu_module.tabu_search(random_problem(seed, 6), {}, None, tenure=tenure, seed=seed,
+                            max_evaluations=2000)
+
+    best_score = initial_scores[0]
+    last_moves = {}
+    for iteration, ((scores, allowed, move_index), changed) in enumerate(
+            zip(choices, changed_masks)):
+        moved_courses = np.argmax(changed, axis=1)
+        for course, moved_at in last_moves.items():
+            course_moves = moved_courses == course
+            if iteration - moved_at <= tenure:
+                # aspiration aside, course stays tabu
+                assert not (allowed & course_moves & (scores <= best_score)).any()
+            else:
+                assert allowed[course_moves].all()
+        last_moves[int(moved_courses[move_index])] = iteration
+        best_score = max(best_score, scores[move_index])
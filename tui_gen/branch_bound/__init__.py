@@ -0,0 +1,244 @@
+"""
+Module containing exact branch and bound solver.
+
+Courses are assigned depth first, course with fewest groups first. Every partial
+assignment gets optimistic bound of score of its completions: conflicts among assigned
+groups plus least conflicts every remaining course must add with them, and per day best
+terms still reachable (see _day_bounds). Branches whose bound does not beat best score
+found so far are pruned, so finished search proves optimum.
+"""
+import math
+from datetime import datetime
+
+import numpy as np
+
+from tui_gen.branch_bound.branch_bound_report import BranchBoundReport
+from tui_gen.gen_alg.rating import rate_encoded_population, score_upper_bound, scoring_weights
+from tui_gen.models.compiled_problem import CompiledProblem
+from tui_gen.models.timeline import DAY_COUNT
+from tui_gen.termination import Termination, TerminationReasonEnum
+
+_MINUTE_9 = 9 * 60
+_MINUTE_11 = 11 * 60
+_MINUTE_15 = 15 * 60
+_MINUTE_17 = 17 * 60
+_MINUTE_24 = 24 * 60
+
+_DAY_BITS = 1 << np.arange(DAY_COUNT)
+
+
+def _group_day_starts(problem):
+    """
+    Find first and last activity start of every group on every day.
+    :param CompiledProblem problem: compiled problem
+    :returns tuple: first starts and last starts of shape (group_count, 10),
+        days without activities hold 24:00 and -1
+    """
+    first_starts = np.full((problem.group_count, DAY_COUNT), _MINUTE_24, dtype=np.int64)
+    last_starts = np.full((problem.group_count, DAY_COUNT), -1, dtype=np.int64)
+    for group_index in range(problem.group_count):
+        for day in range(DAY_COUNT):
+            day_starts = problem.activity_starts[
+                problem.activity_day_offsets[group_index, day]:
+                problem.activity_day_offsets[group_index, day + 1]]
+            if len(day_starts):
+                first_starts[group_index, day] = day_starts.min()
+                last_starts[group_index, day] = day_starts.max()
+    return first_starts, last_starts
+
+
+def _suffix_days(day_sets):
+    """
+    Combine day bitsets of every suffix of course order.
+    :param numpy.ndarray day_sets: day bitset of every course in order
+    :returns numpy.ndarray: day flags of shape (course_count + 1, 10), row i combines
+        courses from i on
+    """
+    suffix_sets = np.zeros(len(day_sets) + 1, dtype=np.int64)
+    for index in range(len(day_sets) - 1, -1, -1):
+        suffix_sets[index] = suffix_sets[index + 1] | day_sets[index]
+    return (suffix_sets[:, None] & _DAY_BITS) != 0
+
+
+class _BranchAndBound(object):
+    """
+    Class representing state of single branch and bound search.
+    """
+
+    def __init__(self, problem, scoring_values, termination):
+        self.problem = problem
+        self.scoring_values = scoring_values
+        self.termination = termination
+        self.weights = scoring_weights(scoring_values)
+        self.order = np.argsort(problem.group_counts, kind='stable')
+        self.first_starts, self.last_starts = _group_day_starts(problem)
+
+        course_groups = np.split(problem.group_days, problem.group_offsets[1:])
+        forced_days = np.array([np.bitwise_and.reduce(group_days)
+                                for group_days in course_groups], dtype=np.int64)
+        possible_days = np.array([np.bitwise_or.reduce(group_days)
+                                  for group_days in course_groups], dtype=np.int64)
+        self.suffix_forced = _suffix_days(forced_days[self.order])
+        self.suffix_possible = _suffix_days(possible_days[self.order])
+
+        self.assignment = np.zeros(problem.course_count, dtype=np.int64)
+        self.best_assignment = None
+        self.best_score = -math.inf
+        self.nodes = 0
+        self.evaluations = 0
+        self.termination_reason = None
+
+    def _day_bounds(self, depth, first_starts, last_starts):
+        """
+        Calculate optimistic day scores of partial assignments. Day empty so far scores
+        the better of free day bonus (unless remaining course forces activities on it)
+        and busy day bonuses (if remaining course can put activities on it). Day with
+        activities gets penalties its first and last start already cause and bonuses
+        they do not rule out. 2h windows can still be filled, so they are not counted.
+        :param int depth: number of assigned courses
+        :param numpy.ndarray first_starts: first starts per day of partial assignments
+        :param numpy.ndarray last_starts: last starts per day of partial assignments
+        :returns numpy.ndarray: bound of day scores per partial assignment
+        """
+        _, before_9_penalty, after_17_penalty, _, \
+            free_day_bonus, not_before_11_bonus, not_after_15_bonus = self.weights
+        not_before_11_bonus = max(0, not_before_11_bonus)
+        not_after_15_bonus = max(0, not_after_15_bonus)
+
+        empty_bounds = np.maximum(
+            np.where(self.suffix_forced[depth], -math.inf, free_day_bonus),
+            np.where(self.suffix_possible[depth],
+                     not_before_11_bonus + not_after_15_bonus, -math.inf))
+        busy_bounds = before_9_penalty * (first_starts < _MINUTE_9) \
+            + after_17_penalty * (last_starts > _MINUTE_17) \
+            + not_before_11_bonus * (first_starts >= _MINUTE_11) \
+            + not_after_15_bonus * (last_starts <= _MINUTE_15)
+        return np.where(last_starts >= 0, busy_bounds, empty_bounds).sum(axis=-1)
+
+    def _child_bounds(self, depth, groups, conflicts, group_conflicts, first_starts,
+                      last_starts):
+        """
+        Calculate bounds of assigning every group of course at depth.
+        :param int depth: number of assigned courses
+        :param numpy.ndarray groups: global indices of candidate groups
+        :param int conflicts: conflicts among assigned groups
+        :param numpy.ndarray group_conflicts: conflicts every group adds to assigned ones
+        :param numpy.ndarray first_starts: first starts per day of assignment
+        :param numpy.ndarray last_starts: last starts per day of assignment
+        :returns tuple: bounds, conflict counts and first and last starts of children
+        """
+        child_conflicts = conflicts + group_conflicts[groups]
+        child_group_conflicts = group_conflicts + self.problem.conflict_table.rows(groups)
+        remaining_courses = self.order[depth + 1:]
+        least_conflicts = np.minimum.reduceat(
+            child_group_conflicts, self.problem.group_offsets, axis=1)[:, remaining_courses]
+
+        child_first_starts = np.minimum(first_starts, self.first_starts[groups])
+        child_last_starts = np.maximum(last_starts, self.last_starts[groups])
+        bounds = self.weights[0] * (child_conflicts + least_conflicts.sum(axis=1)) \
+            + self._day_bounds(depth + 1, child_first_starts, child_last_starts)
+        return bounds, child_conflicts, child_group_conflicts, child_first_starts, \
+            child_last_starts
+
+    def _rate_leaf(self):
+        """
+        Rate complete assignment, keeping it if it is best so far.
+        """
+        self.evaluations += 1
+        score = rate_encoded_population(
+            self.problem, self.assignment[None, :], self.scoring_values)[0]
+        if score > self.best_score:
+            self.best_score = score
+            self.best_assignment = self.assignment.copy()
+
+    def _expand(self, depth, conflicts, group_conflicts, first_starts, last_starts):
+        """
+        Create search frame of partial assignment: groups of course at depth with bounds
+        and states of their children, most promising group first.
+        :param int depth: number of assigned courses
+        :param int conflicts: conflicts among assigned groups
+        :param numpy.ndarray group_conflicts: conflicts every group adds to assigned ones
+        :param numpy.ndarray first_starts: first starts per day of assignment
+        :param numpy.ndarray last_starts: last starts per day of assignment
+        :returns list: global indices of groups, their bounds, child states and position
+            of next group to try
+        """
+        self.nodes += 1
+        course = self.order[depth]
+        groups = self.problem.group_offsets[course] + np.arange(self.problem.group_counts[course])
+        bounds, *child_states = self._child_bounds(
+            depth, groups, conflicts, group_conflicts, first_starts, last_starts)
+        order = np.argsort(-bounds, kind='stable')
+        return [groups[order], bounds[order], [state[order] for state in child_states], 0]
+
+    def search(self, conflicts, group_conflicts, first_starts, last_starts):
+        """
+        Search all completions of empty assignment depth first, most promising group first.
+        Stack holds frame of every assigned course (see _expand), so search depth is not
+        limited by recursion.
+        :param int conflicts: conflicts among assigned groups
+        :param numpy.ndarray group_conflicts: conflicts every group adds to assigned ones
+        :param numpy.ndarray first_starts: first starts per day of assignment
+        :param numpy.ndarray last_starts: last starts per day of assignment
+        """
+        if self.problem.course_count == 0:
+            self.nodes += 1
+            self._rate_leaf()
+            return
+
+        frames = [self._expand(0, conflicts, group_conflicts, first_starts, last_starts)]
+        while frames:
+            depth = len(frames) - 1
+            groups, bounds, child_states, position = frames[-1]
+            if position == len(groups) or bounds[position] <= self.best_score:
+                frames.pop()
+                continue
+            # first solution is always found, so there is a result to return
+            if self.best_assignment is not None:
+                self.termination_reason = self.termination.reason(self.best_score, None, 0)
+                if self.termination_reason is not None:
+                    return
+
+            frames[-1][3] += 1
+            course = self.order[depth]
+            self.assignment[course] = groups[position] - self.problem.group_offsets[course]
+            if depth + 1 == self.problem.course_count:
+                self.nodes += 1
+                self._rate_leaf()
+            else:
+                frames.append(self._expand(depth + 1,
+                                           *(state[position] for state in child_states)))
+
+
+def branch_and_bound(problem_dict, scoring_values, time_budget=None, target_score=None):
+    """
+    Find optimal solution with branch and bound.
+    :param dict problem_dict: problem dictionary
+    :param dict scoring_values: dictionary of scoring values, penalties must not be positive
+    :param float time_budget: max run time in seconds, best solution found so far is returned
+        when it runs out
+    :param float target_score: score search stops at when reached
+    :returns BranchBoundReport: final report, optimal when search was not cut short
+    """
+    if max(scoring_weights(scoring_values)[:4]) > 0:
+        raise ValueError("penalties must not be positive")
+    for course_name, group_list in problem_dict.items():
+        if not group_list:
+            raise ValueError("Course {} has no groups".format(course_name))
+
+    time_start = datetime.now()
+    # deadline is counted from here, so compilation is charged to time budget
+    termination = Termination(None, time_budget, None, target_score)
+    problem = CompiledProblem(problem_dict)
+    termination.upper_bound = score_upper_bound(problem, scoring_values)
+    search = _BranchAndBound(problem, scoring_values, termination)
+    search.search(0, problem.conflict_table.diagonal.astype(np.int64),
+                  np.full(DAY_COUNT, _MINUTE_24, dtype=np.int64),
+                  np.full(DAY_COUNT, -1, dtype=np.int64))
+    time_end = datetime.now()
+
+    termination_reason = search.termination_reason or TerminationReasonEnum.SearchExhausted
+    return BranchBoundReport(problem.decode_chromosome(search.best_assignment),
+                             search.best_score, search.nodes, time_end-time_start,
+                             evaluations=search.evaluations,
+                             termination_reason=termination_reason)
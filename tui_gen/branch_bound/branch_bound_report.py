@@ -0,0 +1,22 @@
+"""
+Module containing class descripting branch and bound solution and details.
+"""
+
+from tui_gen.gen_alg.genetic_algorithm_report import GeneticAlgorithmReport
+from tui_gen.termination import TerminationReasonEnum
+
+
+class BranchBoundReport(GeneticAlgorithmReport):
+    """
+    Class descripting branch and bound solution and details.
+    Iterations are visited search nodes, evaluations are rated complete assignments.
+    """
+
+    @property
+    def optimal(self):
+        """
+        Check whether solution is proven optimal.
+        :return bool: whether search was exhausted or reached score upper bound
+        """
+        return self.termination_reason in (TerminationReasonEnum.SearchExhausted,
+                                           TerminationReasonEnum.UpperBound)
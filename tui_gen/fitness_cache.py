@@ -0,0 +1,66 @@
+"""
+Module containing bounded fitness cache shared by rating functions.
+"""
+from collections import OrderedDict
+
+
+class FitnessCache(object):
+    """
+    Class representing genotype keyed fitness cache with LRU eviction.
+
+    Cache is valid for single set of scoring values only, so it should be created per run.
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._scores = OrderedDict()
+
+    def __len__(self):
+        return len(self._scores)
+
+    @staticmethod
+    def chromosome_key(chromosome):
+        """
+        Create key of chromosome (or location) dictionary.
+        Every group belongs to single course, so set of chosen groups identifies
+        chromosome regardless of key order.
+        :param dict chromosome: chromosome
+        :returns frozenset: cache key
+        """
+        return frozenset(chromosome.values())
+
+    @staticmethod
+    def encoded_chromosome_key(encoded_chromosome):
+        """
+        Create key of encoded chromosome.
+        :param numpy.ndarray encoded_chromosome: encoded chromosome
+        :returns bytes: cache key
+        """
+        return encoded_chromosome.tobytes()
+
+    def get(self, key):
+        """
+        Get cached score, marking it as recently used.
+        :param key: cache key
+        :returns: cached score or None if score is not cached
+        """
+        score = self._scores.get(key)
+        if score is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._scores.move_to_end(key)
+        return score
+
+    def put(self, key, score):
+        """
+        Store score, evicting least recently used ones over max size.
+        :param key: cache key
+        :param score: score to store
+        """
+        self._scores[key] = score
+        self._scores.move_to_end(key)
+        while len(self._scores) > self.max_size:
+            self._scores.popitem(last=False)
@@ -1,18 +1,32 @@
 """
 Module containing genetic algorithm logic.
 """
+from contextlib import nullcontext
 from copy import copy
 import math
-from random import choice as rand_choice, randrange, random, choices as rand_choices, sample
+from multiprocessing import Pipe, Process
 from datetime import datetime
 from enum import Enum
+from time import perf_counter
 
 import numpy as np
 
-from tui_gen.gen_alg.rating import rate_population
+from tui_gen import parallel_rating
+from tui_gen.fitness_cache import FitnessCache
+from tui_gen.gen_alg.rating import rate_encoded_population, rate_encoded_breakdown, \
+    rate_encoded_delta, score_upper_bound, combine_breakdown
+from tui_gen.models.compiled_problem import CompiledProblem
+from tui_gen.phase_timer import PhaseTimer
+from tui_gen.progress import ConsoleReporter, ProgressRecorder, population_diversity
+from tui_gen.termination import Termination, TerminationReasonEnum
 from tui_gen.gen_alg.genetic_algorithm_report import GeneticAlgorithmReport
 
 
+_DISABLED_TIMER = PhaseTimer(enabled=False)
+# seconds between checks that island process is alive while waiting for it
+_ISLAND_POLL_INTERVAL = 1.0
+
+
 class CrossoverMethodEnum(Enum):
     """
     Enum containing values for different methods of crossover
@@ -31,37 +45,105 @@ class MutationMethodEnum(Enum):
     Range = 3
 
 
-def tournament_selection(population, population_rating, tour_size=3, elite_size=0, dropout_size=0):
+class MigrationTopologyEnum(Enum):
     """
-    Perform tournament selection.
-    :param list population: population to perform selection on
+    Enum containing values for different topologies of island model migration
+    """
+    Ring = 1
+    FullyConnected = 2
+
+
+class LocalSearchMethodEnum(Enum):
+    """
+    Enum containing values for different methods of hill climbing
+    """
+    FirstImprovement = 1
+    BestImprovement = 2
+
+
+def _draw_tournaments(candidate_indices, tour_count, tour_size, rng):
+    """
+    Draw tournaments of distinct candidates as index matrix.
+    Rows drawing the same candidate twice are drawn again.
+    :param numpy.ndarray candidate_indices: indices of population members taking part
+    :param int tour_count: number of tournaments
+    :param int tour_size: tour size
+    :param numpy.random.Generator rng: random generator
+    :returns numpy.ndarray: population indices, (tour_count, tour_size)
+    """
+    if tour_size > len(candidate_indices):
+        raise ValueError("tour_size must not be greater than number of candidates")
+    tours = rng.integers(0, len(candidate_indices), size=(tour_count, tour_size))
+    while True:
+        sorted_tours = np.sort(tours, axis=1)
+        repeated = (sorted_tours[:, 1:] == sorted_tours[:, :-1]).any(axis=1)
+        if not repeated.any():
+            break
+        tours[repeated] = rng.integers(
+            0, len(candidate_indices), size=(np.count_nonzero(repeated), tour_size))
+    return candidate_indices[tours]
+
+
+def _tournament_selection_indices(population_rating, tour_size, elite_size, dropout_size, rng):
+    """
+    Perform tournament selection over population indices.
+    All tournaments are drawn and decided at once.
     :param list population_rating: rating of population members
     :param int tour_size: tour size
     :param int elite_size: top chromosome retain count
     :param float dropout_size: worst of popultaion loss size
+    :param numpy.random.Generator rng: random generator
+    :returns numpy.ndarray: indices of selected population members
     """
-    og_population_len = len(population)
-    survived_population = []
-    population_rating_np = np.array(population_rating)
+    population_rating_np = np.asarray(population_rating)
+    og_population_len = len(population_rating_np)
+    candidate_mask = np.ones(og_population_len, dtype=bool)
+    elite_indices = np.empty(0, dtype=np.int64)
 
     if dropout_size > 0 or elite_size > 0:
         sorted_rating = np.argsort(population_rating_np)
+        if elite_size > 0:
+            elite_indices = sorted_rating[-elite_size:][::-1]
+        if dropout_size > 0:
+            candidate_mask[sorted_rating[:dropout_size]] = False
+
+    tours = _draw_tournaments(np.flatnonzero(candidate_mask),
+                              max(0, og_population_len - len(elite_indices)), tour_size, rng)
+    winner_indices = tours[np.arange(len(tours)),
+                           np.argmax(population_rating_np[tours], axis=1)]
+    return np.concatenate((elite_indices, winner_indices))
 
-    if elite_size > 0:
-        for preserved_position in sorted_rating[-elite_size:][::-1]:
-            survived_population.append(population[preserved_position])
 
-    if dropout_size > 0:
-        population_np = np.array(population)
-        population_np = np.delete(population_np, sorted_rating[:dropout_size])
-        population = population_np.tolist()
+def tournament_selection(population, population_rating, tour_size=3, elite_size=0, dropout_size=0,
+                         rng=None):
+    """
+    Perform tournament selection.
+    :param list population: population to perform selection on
+    :param list population_rating: rating of population members
+    :param int tour_size: tour size
+    :param int elite_size: top chromosome retain count
+    :param float dropout_size: worst of popultaion loss size
+    :param numpy.random.Generator rng: random generator, fresh one if not given
+    """
+    return [population[pop_index] for pop_index in _tournament_selection_indices(
+        population_rating, tour_size, elite_size, dropout_size,
+        np.random.default_rng(rng)).tolist()]
 
-    while len(survived_population) < og_population_len:
-        chosen_indicies = sample(range(len(population)), k=tour_size)
-        index_of_chosen_indicies = np.argmax(population_rating_np[chosen_indicies])
-        pop_index_chosen = chosen_indicies[index_of_chosen_indicies]
-        survived_population.append(population[pop_index_chosen])
-    return survived_population
+
+def encoded_tournament_selection(population, population_rating, tour_size=3, elite_size=0,
+                                 dropout_size=0, rng=None):
+    """
+    Perform tournament selection on encoded population.
+    :param numpy.ndarray population: encoded population to perform selection on
+    :param list population_rating: rating of population members
+    :param int tour_size: tour size
+    :param int elite_size: top chromosome retain count
+    :param float dropout_size: worst of popultaion loss size
+    :param numpy.random.Generator rng: random generator, fresh one if not given
+    :returns numpy.ndarray: selected encoded chromosomes
+    """
+    return population[_tournament_selection_indices(
+        population_rating, tour_size, elite_size, dropout_size, np.random.default_rng(rng))]
 
 
 def logistic(population_rating):
@@ -88,71 +170,170 @@ def softplus(population_rating):
     return scores_softplus
 
 
-def roulette_selection(population, population_rating, activation_func=softplus):
+def roulette_selection(population, population_rating, activation_func=softplus, rng=None):
     """
     Perform roulette selection.
     :param list population: population to perform selection on
     :param list population_rating: rating of population members
     :param function activation_func: activation function
+    :param numpy.random.Generator rng: random generator, fresh one if not given
     :returns list: selected chromosomes
     """
-    return rand_choices(population, weights=activation_func(population_rating), k=len(population))
+    weights = np.array(activation_func(population_rating))
+    selected_indices = np.random.default_rng(rng).choice(
+        len(population), size=len(population), p=weights / weights.sum())
+    return [population[pop_index] for pop_index in selected_indices.tolist()]
 
 
-def chromosome_mutation(chromo, problem_dict, method=MutationMethodEnum.Standard):
+def chromosome_mutation(chromo, problem_dict, method=MutationMethodEnum.Standard, key_list=None,
+                        rng=None):
     """
     Perform mutation on chromosome.
     :param dict chromo: chromosome to perform mutation on
     :param dict problem_dict: problem dictionary
     :param MutationMethodEnum method: mutation method
+    :param list key_list: list of problem keys, built from problem dictionary if not given
+    :param numpy.random.Generator rng: random generator, fresh one if not given
     :return dict: mutated chromosome
     """
-    key_list = list(problem_dict.keys())
+    rng = np.random.default_rng(rng)
+    if key_list is None:
+        key_list = list(problem_dict.keys())
     mutated_chromo = copy(chromo)
     mutation_keys = []
     if method == MutationMethodEnum.Standard:
-        mutation_keys.append(rand_choice(key_list))
+        mutation_keys.append(key_list[rng.integers(len(key_list))])
     elif method == MutationMethodEnum.DoubleStandard:
-        mutation_keys.extend(sample(key_list, 2))
+        mutation_keys.extend(key_list[key_index]
+                             for key_index in rng.choice(len(key_list), 2, replace=False))
     elif method == MutationMethodEnum.Range:
         for key in key_list:
-            if random() > 0.5:
+            if rng.random() > 0.5:
                 mutation_keys.append(key)
 
     for selected_key in mutation_keys:
-        mutated_chromo[selected_key] = rand_choice(problem_dict[selected_key])
+        group_list = problem_dict[selected_key]
+        mutated_chromo[selected_key] = group_list[rng.integers(len(group_list))]
     return mutated_chromo
 
 
-def population_mutation(population, problem_dict, probability, method=MutationMethodEnum.Standard):
+def _encoded_mutation_mask(problem, mutated, method, rng):
+    """
+    Create mask of genes to be mutated in encoded population.
+    Mirrors gene choice of chromosome_mutation, but only genes of courses with
+    alternative groups are mutated.
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray mutated: boolean mask of chromosomes to be mutated
+    :param MutationMethodEnum method: mutation method
+    :param numpy.random.Generator rng: random generator
+    :return numpy.ndarray: boolean mutation mask, (pop_size, course_count)
+    """
+    pop_size, course_count = len(mutated), problem.course_count
+    free_courses = problem.free_courses
+    free_count = len(free_courses)
+    if method == MutationMethodEnum.Range:
+        return (rng.random((pop_size, course_count)) > 0.5) & mutated[:, None] \
+            & (problem.group_counts > 1)
+
+    mutation_mask = np.zeros((pop_size, course_count), dtype=bool)
+    if method == MutationMethodEnum.DoubleStandard and course_count < 2:
+        raise ValueError("DoubleStandard mutation needs at least 2 courses")
+    if free_count == 0:
+        return mutation_mask
+    chromo_indices = np.flatnonzero(mutated)
+    mutation_slots = rng.integers(0, free_count, size=len(chromo_indices))
+    mutation_mask[chromo_indices, free_courses[mutation_slots]] = True
+    if method == MutationMethodEnum.DoubleStandard and free_count > 1:
+        second_slots = (mutation_slots + rng.integers(
+            1, free_count, size=len(chromo_indices))) % free_count
+        mutation_mask[chromo_indices, free_courses[second_slots]] = True
+    return mutation_mask
+
+
+def _apply_encoded_mutation(population, problem, mutation_mask, rng):
+    """
+    Draw new groups of masked genes, honouring group count of every course.
+    :param numpy.ndarray population: encoded population to perform mutation on
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray mutation_mask: boolean mutation mask
+    :param numpy.random.Generator rng: random generator
+    :return numpy.ndarray: encoded population after mutation
+    """
+    mutated_population = population.copy()
+    _, mutation_courses = np.nonzero(mutation_mask)
+    mutated_population[mutation_mask] = rng.integers(
+        0, problem.group_counts[mutation_courses])
+    return mutated_population
+
+
+def encoded_chromosome_mutation(encoded_chromo, problem, method=MutationMethodEnum.Standard,
+                                rng=None):
+    """
+    Perform mutation on encoded chromosome.
+    :param numpy.ndarray encoded_chromo: encoded chromosome to perform mutation on
+    :param CompiledProblem problem: compiled problem
+    :param MutationMethodEnum method: mutation method
+    :param numpy.random.Generator rng: random generator, fresh one if not given
+    :return numpy.ndarray: mutated encoded chromosome
+    """
+    rng = np.random.default_rng(rng)
+    mutation_mask = _encoded_mutation_mask(problem, np.ones(1, dtype=bool), method, rng)
+    return _apply_encoded_mutation(encoded_chromo[None, :], problem, mutation_mask, rng)[0]
+
+
+def population_mutation(population, problem_dict, probability, method=MutationMethodEnum.Standard,
+                        rng=None):
     """
     Perform mutation on population.
     :param list population: population to perform mutation on
     :param dict problem_dict: problem dictionary
     :param int probability: mutation probability
     :param MutationMethodEnum method: mutation method
+    :param numpy.random.Generator rng: random generator, fresh one if not given
     :return list: population after mutation
     """
+    rng = np.random.default_rng(rng)
+    key_list = list(problem_dict.keys())
     mutated_population = []
     for chromo in population:
-        if random() <= probability:
-            chromo = chromosome_mutation(chromo, problem_dict, method)
+        if rng.random() <= probability:
+            chromo = chromosome_mutation(chromo, problem_dict, method, key_list, rng)
         mutated_population.append(chromo)
     return mutated_population
 
 
-def chromosomes_crossover(chromo_0, chromo_1):
+def encoded_population_mutation(population, problem, probability,
+                                method=MutationMethodEnum.Standard, rng=None):
+    """
+    Perform mutation on encoded population.
+    Mutated genes and their new groups are drawn for whole population at once.
+    :param numpy.ndarray population: encoded population to perform mutation on
+    :param CompiledProblem problem: compiled problem
+    :param int probability: mutation probability
+    :param MutationMethodEnum method: mutation method
+    :param numpy.random.Generator rng: random generator, fresh one if not given
+    :return numpy.ndarray: encoded population after mutation
+    """
+    rng = np.random.default_rng(rng)
+    mutation_mask = _encoded_mutation_mask(
+        problem, rng.random(len(population)) <= probability, method, rng)
+    return _apply_encoded_mutation(population, problem, mutation_mask, rng)
+
+
+def chromosomes_crossover(chromo_0, chromo_1, rng=None):
     """
     Perform uniform crossover on two chromosomes.
     :param dict chromo_0: first chromosome to perform crossover on
     :param dict chromo_1: second chromosome to perform crossover on
+    :param numpy.random.Generator rng: random generator, fresh one if not given
     :return tuple: crossed chromosome pair
     """
+    rng = np.random.default_rng(rng)
     crossd_chromo_0 = {}
     crossd_chromo_1 = {}
 
     for key in chromo_0.keys():
-        if randrange(2):
+        if rng.integers(2):
             crossd_chromo_0[key] = chromo_0[key]
             crossd_chromo_1[key] = chromo_1[key]
         else:
@@ -161,19 +342,21 @@ def chromosomes_crossover(chromo_0, chromo_1):
     return crossd_chromo_0, crossd_chromo_1
 
 
-def chromosomes_crossover_swap_prob(chromo_0, chromo_1, swap_pob):
+def chromosomes_crossover_swap_prob(chromo_0, chromo_1, swap_pob, rng=None):
     """
     Perform uniform crossover on two chromosomes with swap probability.
     :param dict chromo_0: first chromosome to perform crossover on
     :param dict chromo_1: second chromosome to perform crossover on
     :param float swap_pob: swap_probability
+    :param numpy.random.Generator rng: random generator, fresh one if not given
     :return tuple: crossed chromosome pair
     """
+    rng = np.random.default_rng(rng)
     crossd_chromo_0 = {}
     crossd_chromo_1 = {}
 
     for key in chromo_0.keys():
-        if random() < swap_pob:
+        if rng.random() < swap_pob:
             crossd_chromo_0[key] = chromo_0[key]
             crossd_chromo_1[key] = chromo_1[key]
         else:
@@ -182,17 +365,20 @@ def chromosomes_crossover_swap_prob(chromo_0, chromo_1, swap_pob):
     return crossd_chromo_0, crossd_chromo_1
 
 
-def chromosomes_crossover_classy(chromo_0, chromo_1, cross_point_count=1):
+def chromosomes_crossover_classy(chromo_0, chromo_1, cross_point_count=1, rng=None):
     """
     Perform classy crossover on two chromosomes.
     :param dict chromo_0: first chromosome to perform crossover on
     :param dict chromo_1: second chromosome to perform crossover on
     :param int cross_point_count: cross point count
+    :param numpy.random.Generator rng: random generator, fresh one if not given
     :return tuple: crossed chromosome pair
     """
+    rng = np.random.default_rng(rng)
     keys_sorted = sorted(list(chromo_0.keys()))
     keys_sorted_len = len(keys_sorted)
-    cross_points = sample(range(keys_sorted_len), min(cross_point_count, keys_sorted_len))
+    cross_points = rng.choice(
+        keys_sorted_len, min(cross_point_count, keys_sorted_len), replace=False).tolist()
     keys_counter = 0
     use_snd = False
     crossd_chromo_0 = {}
@@ -215,7 +401,8 @@ def population_crossover(population,
                          probability,
                          method=CrossoverMethodEnum.Uniform,
                          classy_cross_count=1,
-                         swap_prob=0.5):
+                         swap_prob=0.5,
+                         rng=None):
     """
     Perform crossover on population.
     :param list population: population to perform crossover on
@@ -223,88 +410,579 @@ def population_crossover(population,
     :param bool use_classy: whether to use classic crossover
     :param int classy_cross_count: number of crossings when classy method is used
     :param float swap_prob: swap probability when Probability method is used
+    :param numpy.random.Generator rng: random generator, fresh one if not given
     :return list: population after crossover
     """
-    og_population = copy(population)
+    rng = np.random.default_rng(rng)
+    og_population = [population[pop_index]
+                     for pop_index in rng.permutation(len(population)).tolist()]
     crossoverd_population = []
-    while len(og_population) >= 2:
-        chromo_0 = og_population.pop(randrange(len(og_population)))
-        chromo_1 = og_population.pop(randrange(len(og_population)))
-        if random() <= probability:
+    for pair_start in range(0, len(og_population) - 1, 2):
+        chromo_0 = og_population[pair_start]
+        chromo_1 = og_population[pair_start + 1]
+        if rng.random() <= probability:
             if method == CrossoverMethodEnum.Classy:
                 chromo_0, chromo_1 = chromosomes_crossover_classy(
-                    chromo_0, chromo_1, classy_cross_count)
+                    chromo_0, chromo_1, classy_cross_count, rng)
             elif method == CrossoverMethodEnum.Probability:
                 chromo_0, chromo_1 = chromosomes_crossover_swap_prob(
-                    chromo_0, chromo_1, swap_prob)
+                    chromo_0, chromo_1, swap_prob, rng)
             else:
-                chromo_0, chromo_1 = chromosomes_crossover(chromo_0, chromo_1)
+                chromo_0, chromo_1 = chromosomes_crossover(chromo_0, chromo_1, rng)
         crossoverd_population.append(chromo_0)
         crossoverd_population.append(chromo_1)
-    if og_population:
-        crossoverd_population.append(og_population[0])
+    if len(og_population) % 2:
+        crossoverd_population.append(og_population[-1])
+    return crossoverd_population
+
+
+def _encoded_crossover_masks(pair_count, course_count, method, classy_cross_count, swap_prob,
+                             rng, course_order=None):
+    """
+    Create masks of genes to be swapped between chromosomes of every pair.
+    Mirrors gene choice of chromosomes_crossover* functions.
+    :param int pair_count: number of chromosome pairs
+    :param int course_count: chromosome length
+    :param CrossoverMethodEnum method: crossover method
+    :param int classy_cross_count: number of crossings when classy method is used
+    :param float swap_prob: swap probability when Probability method is used
+    :param numpy.random.Generator rng: random generator
+    :param numpy.ndarray course_order: order of courses classy cross points split,
+        chromosome order if not given
+    :return numpy.ndarray: boolean swap masks, (pair_count, course_count)
+    """
+    if method == CrossoverMethodEnum.Classy:
+        cross_point_count = min(classy_cross_count, course_count)
+        cross_points = np.zeros((pair_count, course_count), dtype=np.int64)
+        chosen_points = np.argsort(
+            rng.random((pair_count, course_count)), axis=1)[:, :cross_point_count]
+        np.put_along_axis(cross_points, chosen_points, 1, axis=1)
+        ordered_masks = np.cumsum(cross_points, axis=1) % 2 == 0
+        if course_order is None:
+            return ordered_masks
+        swap_masks = np.empty_like(ordered_masks)
+        swap_masks[:, course_order] = ordered_masks
+        return swap_masks
+    if method == CrossoverMethodEnum.Probability:
+        return rng.random((pair_count, course_count)) >= swap_prob
+    return rng.random((pair_count, course_count)) < 0.5
+
+
+def encoded_population_crossover(population,
+                                 probability,
+                                 method=CrossoverMethodEnum.Uniform,
+                                 classy_cross_count=1,
+                                 swap_prob=0.5,
+                                 rng=None,
+                                 course_order=None):
+    """
+    Perform crossover on encoded population.
+    Chromosomes are paired by one random permutation and all pairs are crossed at once.
+    :param numpy.ndarray population: encoded population to perform crossover on
+    :param int probability: crosspover probability
+    :param CrossoverMethodEnum method: crossover method
+    :param int classy_cross_count: number of crossings when classy method is used
+    :param float swap_prob: swap probability when Probability method is used
+    :param numpy.random.Generator rng: random generator, fresh one if not given
+    :param numpy.ndarray course_order: order of courses classy cross points split,
+        chromosome order if not given, CompiledProblem.sorted_course_order splits
+        the same segments as chromosomes_crossover_classy
+    :return numpy.ndarray: encoded population after crossover
+    """
+    rng = np.random.default_rng(rng)
+    crossoverd_population = population[rng.permutation(len(population))]
+    pair_count, course_count = len(population) // 2, population.shape[1]
+    chromos_0 = crossoverd_population[0:2 * pair_count:2].copy()
+    chromos_1 = crossoverd_population[1:2 * pair_count:2].copy()
+
+    swap_masks = _encoded_crossover_masks(
+        pair_count, course_count, method, classy_cross_count, swap_prob, rng, course_order)
+    swap_masks &= (rng.random(pair_count) <= probability)[:, None]
+    crossoverd_population[0:2 * pair_count:2] = np.where(swap_masks, chromos_1, chromos_0)
+    crossoverd_population[1:2 * pair_count:2] = np.where(swap_masks, chromos_0, chromos_1)
     return crossoverd_population
 
 
-def create_random_chromosome(problem_dict):
+def create_random_chromosome(problem_dict, rng=None):
     """
     Create random chomosome.
     :param dict problem_dict: problem dictionary
+    :param numpy.random.Generator rng: random generator, fresh one if not given
     :returns dict: randomly created chomosome
     """
+    rng = np.random.default_rng(rng)
     return {
-        course_name: rand_choice(group_list) for course_name, group_list in problem_dict.items()
+        course_name: group_list[rng.integers(len(group_list))]
+        for course_name, group_list in problem_dict.items()
     }
 
 
-def create_population(problem_dict, size):
+def create_population(problem_dict, size, rng=None):
     """
     Create random population.
     :param dict problem_dict: problem dictionary
     :param int size: population size
+    :param numpy.random.Generator rng: random generator, fresh one if not given
     :returns list: randomly created chomosomes
     """
-    return [create_random_chromosome(problem_dict) for _ in range(size)]
+    rng = np.random.default_rng(rng)
+    return [create_random_chromosome(problem_dict, rng) for _ in range(size)]
+
+
+def create_encoded_population(problem, size, rng=None):
+    """
+    Create random encoded population.
+    :param CompiledProblem problem: compiled problem
+    :param int size: population size
+    :param numpy.random.Generator rng: random generator, fresh one if not given
+    :returns numpy.ndarray: randomly created encoded chomosomes
+    """
+    return problem.random_population(size, rng)
+
+
+def hill_climbing(encoded_chromo, problem, scoring_values,
+                  method=LocalSearchMethodEnum.BestImprovement, max_evaluations=math.inf,
+                  deadline=math.inf):
+    """
+    Improve encoded chromosome by changing group of one course at a time until no such
+    change improves it. Neighbours are rated by score delta against current chromosome.
+    Best improvement rates all neighbours and takes the best one, first improvement
+    rates courses one by one (starting after last changed course) and takes best group
+    of first course improving score.
+    Climbing also stops when evaluations or time run out, only neighbours evaluations
+    left allow are rated.
+    :param numpy.ndarray encoded_chromo: encoded chromosome to improve
+    :param CompiledProblem problem: compiled problem
+    :param dict scoring_values: dictionary of scoring values
+    :param LocalSearchMethodEnum method: method of hill climbing
+    :param float max_evaluations: max number of rated chromosomes, including starting one,
+        which is always rated
+    :param float deadline: perf_counter time climbing stops at
+    :returns tuple: improved encoded chromosome, its score and number of rated
+        chromosomes
+    """
+    encoded_chromo = encoded_chromo.copy()
+    conflicts, day_scores = rate_encoded_breakdown(problem, encoded_chromo[None, :],
+                                                   scoring_values)
+    score = combine_breakdown(conflicts, day_scores, scoring_values)[0]
+    evaluations = 1
+    if method == LocalSearchMethodEnum.BestImprovement:
+        course_batches = [np.arange(problem.course_count)]
+    else:
+        course_batches = [np.array([course]) for course in range(problem.course_count)]
+
+    batch_index = 0
+    unimproved_batches = 0
+    while unimproved_batches < len(course_batches) and evaluations < max_evaluations \
+            and perf_counter() < deadline:
+        neighbours, changed = problem.course_neighbours(
+            encoded_chromo, course_batches[batch_index])
+        if len(neighbours) > max_evaluations - evaluations:
+            neighbours = neighbours[:int(max_evaluations - evaluations)]
+            changed = changed[:len(neighbours)]
+        batch_index = (batch_index + 1) % len(course_batches)
+        unimproved_batches += 1
+        if len(neighbours) == 0:
+            continue
+        scores, neighbour_conflicts, neighbour_day_scores = rate_encoded_delta(
+            problem, encoded_chromo, conflicts, day_scores, neighbours, scoring_values, changed)
+        evaluations += len(neighbours)
+        best_index = int(np.argmax(scores))
+        if scores[best_index] > score:
+            encoded_chromo, score = neighbours[best_index], scores[best_index]
+            conflicts = neighbour_conflicts[best_index:best_index + 1]
+            day_scores = neighbour_day_scores[best_index:best_index + 1]
+            unimproved_batches = 0
+    return encoded_chromo, score, evaluations
+
+
+def _polish_top(problem, population, population_rating, size, scoring_values, method,
+                max_evaluations=math.inf, deadline=math.inf):
+    """
+    Replace top rated chromosomes of population with their hill climbing results.
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray population: encoded population, changed in place
+    :param numpy.ndarray population_rating: population rating, changed in place
+    :param int size: number of chromosomes to improve
+    :param dict scoring_values: dictionary of scoring values
+    :param LocalSearchMethodEnum method: method of hill climbing
+    :param float max_evaluations: max number of rated chromosomes
+    :param float deadline: perf_counter time polishing stops at
+    :returns int: number of rated chromosomes
+    """
+    evaluations = 0
+    for index in np.argsort(-population_rating, kind='stable')[:size]:
+        if evaluations >= max_evaluations or perf_counter() >= deadline:
+            break
+        population[index], population_rating[index], chromo_evaluations = hill_climbing(
+            population[index], problem, scoring_values, method, max_evaluations - evaluations,
+            deadline)
+        evaluations += chromo_evaluations
+    return evaluations
+
+
+def _evolve_generation(problem, population, crossover_prob, mutation_prob, scoring_values, rng,
+                      cache=None, rater=None, timer=None):
+    """
+    Perform crossover and mutation on encoded population and rate offspring.
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray population: encoded population selected in previous generation
+    :param float crossover_prob: crossover probability
+    :param float mutation_prob: mutation probability
+    :param dict scoring_values: dictionary of scoring values
+    :param numpy.random.Generator rng: random generator
+    :param FitnessCache cache: fitness cache or None
+    :param ParallelRater rater: worker pool or None
+    :param PhaseTimer timer: timer of generation phases or None
+    :returns tuple: encoded offspring population and its rating
+    """
+    timer = timer or _DISABLED_TIMER
+    started = timer.start()
+    population = encoded_population_crossover(
+        population, crossover_prob, rng=rng, course_order=problem.sorted_course_order)
+    started = timer.lap('crossover', started)
+    population = encoded_population_mutation(
+        population, problem, mutation_prob, MutationMethodEnum.Range, rng)
+    started = timer.lap('mutation', started)
+    population_rating = rate_encoded_population(
+        problem, population, scoring_values, cache, rater)
+    timer.lap('rating', started)
+    return population, population_rating
 
 
 def genetic_algorithm(problem_dict, pop_size, crossover_prob,
-                      mutation_prob, stale_limit, scoring_values, verbose=True):
+                      mutation_prob, stale_limit, scoring_values, verbose=True, cache_size=0,
+                      workers=0, seed=None, time_phases=False, callback=None, time_budget=None,
+                      max_evaluations=None, target_score=None, local_search=None,
+                      local_search_interval=0, local_search_size=1):
     """
     Run genetic algorithm.
     :param dict problem_dict: problem dictionary
     :param int pop_size: population size
     :param float crossover_prob: crossover probability
     :param float mutation_prob: mutation probability
-    :param int stale_limit: max number of stale generations (termination condition)
+    :param int stale_limit: max number of stale generations (termination condition),
+        None disables it
     :param dict scoring_values: dictionary of scoring values
-    :param bool verbose: whether print info during execution
+    :param bool verbose: whether print progress (at most once per second) during execution
+    :param int cache_size: max size of fitness cache, 0 disables caching
+    :param int workers: number of worker processes rating population, 0 rates serially
+    :param seed: seed, numpy.random.SeedSequence or numpy.random.Generator of run,
+        run is not reproducible if not given
+    :param bool time_phases: whether to time crossover, mutation, rating and selection
+    :param callable callback: called with progress record of every generation,
+        run stops early when it returns True
+    :param float time_budget: max run time in seconds (termination condition)
+    :param int max_evaluations: max number of rated solutions (termination condition)
+    :param float target_score: score run stops at when reached (termination condition)
+    :param LocalSearchMethodEnum local_search: method of hill climbing final best chromosome
+        is polished with, None skips polishing
+    :param int local_search_interval: number of generations between polishing top rated
+        chromosomes of population, 0 polishes final best chromosome only
+    :param int local_search_size: number of top rated chromosomes polished
     :returns GeneticAlgorithmReport: final report
     """
-    population = create_population(problem_dict, pop_size)
+    rng = np.random.default_rng(seed)
+    timer = PhaseTimer(time_phases)
+    recorder = ProgressRecorder([ConsoleReporter() if verbose else None, callback])
+    # deadline is counted from here, so compilation is charged to time budget
+    termination = Termination(stale_limit, time_budget, max_evaluations, target_score)
+    problem = CompiledProblem(problem_dict)
+    termination.upper_bound = score_upper_bound(problem, scoring_values)
+    cache = FitnessCache(cache_size) if cache_size > 0 else None
+    # periodic polishing is disabled by interval 0
+    polish_interval = local_search_interval if local_search is not None else 0
+    polish_size = min(local_search_size, pop_size) if polish_interval else 0
+    population = create_encoded_population(problem, pop_size, rng)
     best_score = - math.inf
     best_score_stale_for = 0  # for how many gens. best score is the same
     best_chromo = population[0]
     generation_count = 0
+    evaluations = 0
+    termination_reason = None
     time_start = datetime.now()
-    while best_score_stale_for < stale_limit:
-        generation_count += 1
-
-        population = population_crossover(
-            population, crossover_prob)
-        population = population_mutation(population, problem_dict, mutation_prob, MutationMethodEnum.Range)
-        population_rating = rate_population(population, scoring_values)
-        gen_best_index = np.argmax(population_rating)
-        gen_best_score = population_rating[gen_best_index]
-
-        if gen_best_score > best_score:
-            best_score_stale_for = 0
-            best_score = gen_best_score
-            best_chromo = population[gen_best_index]
-        else:
-            best_score_stale_for += 1
-        if verbose:
-            print("Best score for generation {}: {}".format(generation_count, gen_best_score))
-        #population = roulette_selection(population, population_rating, logistic)
-        population = tournament_selection(population, population_rating)
+    with parallel_rating.ParallelRater(problem, scoring_values, workers) if workers > 0 \
+            else nullcontext() as rater:
+        while termination_reason is None:
+            generation_count += 1
+
+            population, population_rating = _evolve_generation(
+                problem, population, crossover_prob, mutation_prob, scoring_values, rng, cache,
+                rater, timer)
+            evaluations += len(population)
+            if polish_interval and generation_count % polish_interval == 0:
+                started = timer.start()
+                evaluations += _polish_top(
+                    problem, population, population_rating, local_search_size, scoring_values,
+                    local_search, termination.evaluations_left(evaluations), termination.deadline)
+                timer.lap('local search', started)
+            gen_best_index = np.argmax(population_rating)
+            gen_best_score = population_rating[gen_best_index]
+
+            if gen_best_score > best_score:
+                best_score_stale_for = 0
+                best_score = gen_best_score
+                best_chromo = population[gen_best_index].copy()
+            else:
+                best_score_stale_for += 1
+            if recorder.record(population_rating, population_diversity(problem, population),
+                               evaluations):
+                termination_reason = TerminationReasonEnum.Callback
+            else:
+                # polishing rates at least starting chromosomes
+                termination_reason = termination.reason(
+                    best_score, best_score_stale_for, evaluations + pop_size + (
+                        polish_size if (generation_count + 1) % max(polish_interval, 1) == 0
+                        else 0))
+            #population = roulette_selection(population, population_rating, logistic)
+            started = timer.start()
+            population = encoded_tournament_selection(population, population_rating, rng=rng)
+            timer.lap('selection', started)
+            timer.end_round()
+    if local_search is not None and termination.evaluations_left(evaluations) >= 1:
+        best_chromo, best_score, polish_evaluations = hill_climbing(
+            best_chromo, problem, scoring_values, local_search,
+            termination.evaluations_left(evaluations), termination.deadline)
+        evaluations += polish_evaluations
+    time_end = datetime.now()
+    cache_hits, cache_misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    return GeneticAlgorithmReport(problem.decode_chromosome(best_chromo), best_score,
+                                  generation_count, time_end-time_start,
+                                  cache_hits, cache_misses, evaluations, timer,
+                                  recorder.records, termination_reason)
+
+
+def _island_worker(connection, problem, pop_size, crossover_prob, mutation_prob,
+                   scoring_values, migration_interval, migration_size, cache_size, rng):
+    """
+    Evolve single island population in worker process.
+    After every migration_interval generations island sends record of every generation
+    (best score, best chromosome, population rating, population diversity and evaluations
+    of island so far) and its emigrants, then waits for immigrants (None ends evolution).
+    Finally it sends its fitness cache hits, misses and evaluations.
+    :param multiprocessing.connection.Connection connection: connection to main process
+    :param CompiledProblem problem: compiled problem
+    :param int pop_size: island population size
+    :param float crossover_prob: crossover probability
+    :param float mutation_prob: mutation probability
+    :param dict scoring_values: dictionary of scoring values
+    :param int migration_interval: number of generations between migrations
+    :param int migration_size: number of chromosomes sent to neighbours
+    :param int cache_size: max size of fitness cache, 0 disables caching
+    :param numpy.random.Generator rng: random generator of island
+    """
+    cache = FitnessCache(cache_size) if cache_size > 0 else None
+    population = create_encoded_population(problem, pop_size, rng)
+    evaluations = 0
+    while True:
+        generation_records = []
+        for generation in range(migration_interval):
+            if generation > 0:
+                population = encoded_tournament_selection(population, population_rating, rng=rng)
+            population, population_rating = _evolve_generation(
+                problem, population, crossover_prob, mutation_prob, scoring_values, rng, cache)
+            evaluations += len(population)
+            gen_best_index = np.argmax(population_rating)
+            generation_records.append((
+                population_rating[gen_best_index], population[gen_best_index].copy(),
+                population_rating, population_diversity(problem, population), evaluations))
+
+        emigrant_indices = np.argsort(population_rating)[pop_size - migration_size:]
+        connection.send((generation_records,
+                         population[emigrant_indices], population_rating[emigrant_indices]))
+        immigration = connection.recv()
+        if immigration is None:
+            break
+
+        immigrants, immigrants_rating = immigration
+        replaced_indices = np.argsort(population_rating)[:len(immigrants)]
+        population[replaced_indices] = immigrants
+        population_rating[replaced_indices] = immigrants_rating
+        population = encoded_tournament_selection(population, population_rating, rng=rng)
+    connection.send(((cache.hits, cache.misses) if cache is not None else (0, 0))
+                    + (evaluations,))
+
+
+def _island_immigrants(island_reports, island_index, topology, migration_size):
+    """
+    Choose chromosomes migrating to island.
+    :param list island_reports: reports of all islands from last migration interval
+    :param int island_index: index of receiving island
+    :param MigrationTopologyEnum topology: migration topology
+    :param int migration_size: number of chromosomes migrating to island
+    :returns tuple: encoded immigrants and their rating
+    """
+    if topology == MigrationTopologyEnum.Ring:
+        _, emigrants, emigrants_rating = island_reports[island_index - 1]
+        return emigrants, emigrants_rating
+
+    other_reports = island_reports[:island_index] + island_reports[island_index + 1:]
+    if not other_reports:
+        other_reports = island_reports
+    emigrants = np.concatenate([report[1] for report in other_reports])
+    emigrants_rating = np.concatenate([report[2] for report in other_reports])
+    best_indices = np.argsort(emigrants_rating)[len(emigrants_rating) - migration_size:]
+    return emigrants[best_indices], emigrants_rating[best_indices]
+
+
+def _start_islands(problem, island_count, pop_size, crossover_prob, mutation_prob,
+                   scoring_values, migration_interval, migration_size, cache_size, rng):
+    """
+    Start island worker processes, each with independent random generator
+    spawned from generator of calling process.
+    :param CompiledProblem problem: compiled problem
+    :param int island_count: number of islands
+    :param int pop_size: population size of single island
+    :param float crossover_prob: crossover probability
+    :param float mutation_prob: mutation probability
+    :param dict scoring_values: dictionary of scoring values
+    :param int migration_interval: number of generations between migrations
+    :param int migration_size: number of chromosomes sent by every island
+    :param int cache_size: max size of fitness cache of every island
+    :param numpy.random.Generator rng: random generator of run
+    :returns tuple: list of connections to islands and list of island processes
+    """
+    connections = []
+    processes = []
+    for island_rng in rng.spawn(island_count):
+        connection, island_connection = Pipe()
+        process = Process(target=_island_worker, daemon=True, args=(
+            island_connection, problem, pop_size, crossover_prob, mutation_prob, scoring_values,
+            migration_interval, migration_size, cache_size, island_rng))
+        process.start()
+        # only island holds its end, so its exit closes the pipe
+        island_connection.close()
+        connections.append(connection)
+        processes.append(process)
+    return connections, processes
+
+
+def _receive_from_island(connection, process):
+    """
+    Receive message from island, checking that island process is alive while waiting.
+    :param multiprocessing.connection.Connection connection: connection to island
+    :param multiprocessing.Process process: island process
+    :returns object: received message
+    :raises RuntimeError: when island process ended without sending message
+    """
+    try:
+        while not connection.poll(_ISLAND_POLL_INTERVAL):
+            if not process.is_alive() and not connection.poll():
+                raise EOFError
+        return connection.recv()
+    except EOFError:
+        process.join()
+        raise RuntimeError("island process ended unexpectedly with exit code {}".format(
+            process.exitcode)) from None
+
+
+def _stop_islands(connections, processes):
+    """
+    Stop island worker processes.
+    :param list connections: connections to islands
+    :param list processes: island processes
+    :returns tuple: fitness cache hits, misses and evaluations summed over islands
+    """
+    island_totals = []
+    for connection, process in zip(connections, processes):
+        connection.send(None)
+        island_totals.append(_receive_from_island(connection, process))
+    for process in processes:
+        process.join()
+    return tuple(int(total) for total in np.sum(island_totals, axis=0))
+
+
+def _record_island_generation(recorder, island_reports, generation):
+    """
+    Record generation of all islands, rating of all island populations is recorded
+    together, diversity is mean of island diversities.
+    :param ProgressRecorder recorder: progress recorder
+    :param list island_reports: reports of all islands from last migration interval
+    :param int generation: index of generation in migration interval
+    :returns tuple: best score of generation and its chromosome
+    """
+    generation_records = [report[0][generation] for report in island_reports]
+    best_scores, best_chromos, ratings, diversities, evaluations = zip(*generation_records)
+    best_island = int(np.argmax(best_scores))
+    recorder.record(np.concatenate(ratings), float(np.mean(diversities)), sum(evaluations))
+    return best_scores[best_island], best_chromos[best_island]
+
+
+def island_genetic_algorithm(problem_dict, island_count, pop_size, crossover_prob,
+                             mutation_prob, stale_limit, scoring_values, verbose=True,
+                             migration_interval=5, migration_size=2,
+                             topology=MigrationTopologyEnum.Ring, cache_size=0, seed=None):
+    """
+    Run island model genetic algorithm, evolving every island in separate process.
+    Islands exchange their best chromosomes every migration_interval generations,
+    termination condition is applied to best score of all islands. Evaluations count
+    every generation islands evolved, including rest of interval run stopped in.
+    :param dict problem_dict: problem dictionary
+    :param int island_count: number of islands (worker processes)
+    :param int pop_size: population size of single island
+    :param float crossover_prob: crossover probability
+    :param float mutation_prob: mutation probability
+    :param int stale_limit: max number of stale generations (termination condition)
+    :param dict scoring_values: dictionary of scoring values
+    :param bool verbose: whether print progress (at most once per second) during execution
+    :param int migration_interval: number of generations between migrations
+    :param int migration_size: number of chromosomes sent by every island
+    :param MigrationTopologyEnum topology: migration topology
+    :param int cache_size: max size of fitness cache of every island, 0 disables caching
+    :param seed: seed, numpy.random.SeedSequence or numpy.random.Generator of run,
+        run is not reproducible if not given
+    :returns GeneticAlgorithmReport: final report
+    """
+    if island_count <= 0:
+        raise ValueError("island_count must be grater than 0")
+    if migration_interval <= 0:
+        raise ValueError("migration_interval must be grater than 0")
+    if not 0 <= migration_size <= pop_size:
+        raise ValueError("migration_size must be between 0 and pop_size")
+
+    problem = CompiledProblem(problem_dict)
+    time_start = datetime.now()
+    recorder = ProgressRecorder([ConsoleReporter() if verbose else None])
+    connections, processes = _start_islands(
+        problem, island_count, pop_size, crossover_prob, mutation_prob, scoring_values,
+        migration_interval, migration_size, cache_size, np.random.default_rng(seed))
+
+    best_score = - math.inf
+    best_score_stale_for = 0  # for how many gens. best score is the same
+    best_chromo = None
+    generation_count = 0
+    try:
+        while True:
+            island_reports = [_receive_from_island(connection, process)
+                              for connection, process in zip(connections, processes)]
+            for generation in range(migration_interval):
+                generation_count += 1
+                gen_best_score, gen_best_chromo = _record_island_generation(
+                    recorder, island_reports, generation)
+
+                if gen_best_score > best_score:
+                    best_score_stale_for = 0
+                    best_score = gen_best_score
+                    best_chromo = gen_best_chromo
+                else:
+                    best_score_stale_for += 1
+                if best_score_stale_for >= stale_limit:
+                    break
+            if best_score_stale_for >= stale_limit:
+                break
+
+            for island_index, connection in enumerate(connections):
+                connection.send(_island_immigrants(
+                    island_reports, island_index, topology, migration_size))
+
+        cache_hits, cache_misses, evaluations = _stop_islands(connections, processes)
+    finally:
+        # islands still running after error, joined islands are left alone
+        for process in processes:
+            process.terminate()
     time_end = datetime.now()
-    return GeneticAlgorithmReport(best_chromo, best_score, generation_count, time_end-time_start)
+    return GeneticAlgorithmReport(problem.decode_chromosome(best_chromo), best_score,
+                                  generation_count, time_end-time_start,
+                                  cache_hits, cache_misses, evaluations,
+                                  progress=recorder.records,
+                                  termination_reason=TerminationReasonEnum.StaleLimit)
@@ -2,9 +2,14 @@
 Chromosome rating utility.
 """
 from copy import copy
-from datetime import datetime, timedelta
 
+import numpy as np
+
+from tui_gen.fitness_cache import FitnessCache
+from tui_gen.models import timeline
+from tui_gen.models.conflict_table import count_day_conflicts
 from tui_gen.models.parity import Parity
+from tui_gen.models.timeline import DAY_COUNT
 
 _DEFAULT_CONFLICT_PENALTY = -250
 _DEFAULT_BEFORE_9_PENALTY = -10
@@ -15,11 +20,21 @@ _DEFAULT_FREE_DAY_BONUS = 50
 _DEFAULT_NOT_BEFORE_11_BONUS = 10
 _DEFAULT_NOT_AFTER_15_BONUS = 10
 
-_HOUR_9 = datetime(1900, 1, 1, 9, 0)
-_HOUR_11 = datetime(1900, 1, 1, 11, 0)
-_HOUR_15 = datetime(1900, 1, 1, 15, 0)
-_HOUR_17 = datetime(1900, 1, 1, 17, 0)
-_SPAN_2H = timedelta(hours=2)
+_MINUTE_9 = 9 * 60
+_MINUTE_11 = 11 * 60
+_MINUTE_15 = 15 * 60
+_MINUTE_17 = 17 * 60
+_MINUTE_24 = 24 * 60
+_MINUTES_2H = 2 * 60
+
+# below this expected number of activities of all children, rating them whole is faster
+# than rating only their touched days, which takes more (but smaller) steps
+_MIN_DELTA_ACTIVITIES = 8192
+
+_BEFORE_9_MASK = timeline.day_range_mask(0, _MINUTE_9)
+_BEFORE_11_MASK = timeline.day_range_mask(0, _MINUTE_11)
+_AFTER_15_MASK = timeline.day_range_mask(_MINUTE_15 + 1, _MINUTE_24)
+_AFTER_17_MASK = timeline.day_range_mask(_MINUTE_17 + 1, _MINUTE_24)
 
 
 def create_fenotype(chromosome):
@@ -42,6 +57,34 @@ def create_fenotype(chromosome):
     return fenotype
 
 
+def create_minute_fenotype(chromosome):
+    """
+    Create fenotype for rating with times given in minutes.
+    :param dict chromosome: source chromosome
+    :returns list: fenotype (list of list of tuples of (minute, minute))
+    """
+    fenotype = [[] for _ in range(DAY_COUNT)]
+    for group in chromosome.values():
+        for day, minute_start, minute_end in group.activities():
+            fenotype[day].append((minute_start, minute_end, group.name))
+    for day_list in fenotype:
+        day_list.sort()
+
+    return fenotype
+
+
+def create_timeline(chromosome):
+    """
+    Create timeline of activity starts for rating.
+    :param dict chromosome: source chromosome
+    :returns list: timeline (list of day masks of activity starts)
+    """
+    timeline_mask = 0
+    for group in chromosome.values():
+        timeline_mask |= group.start_mask
+    return timeline.split_days(timeline_mask)
+
+
 def _count_conflicts(fenotype):
     """
     Count conflicts in fenotype.
@@ -61,133 +104,444 @@ def _count_conflicts(fenotype):
     return count
 
 
-def _count_before_9(fenotype):
+def _count_before_9(day_masks):
     """
     Count days with first activities before 9.
 
-    :param list fenotype: scored fenotype
+    :param list day_masks: scored timeline
     :return int: "before 9" occurances
     """
-    count = 0
-    for day_list in fenotype:
-        if day_list and day_list[0][0] < _HOUR_9:
-            count += 1
-    return count
+    return sum(1 for day_mask in day_masks if day_mask & _BEFORE_9_MASK)
 
 
-def _count_after_17(fenotype):
+def _count_after_17(day_masks):
     """
     Count days with last activities after 17.
 
-    :param list fenotype: scored fenotype
+    :param list day_masks: scored timeline
     :return int: "after 17" occurances
     """
-    count = 0
-    for day_list in fenotype:
-        if day_list and day_list[-1][0] > _HOUR_17:
-            count += 1
-    return count
+    return sum(1 for day_mask in day_masks if day_mask & _AFTER_17_MASK)
 
 
-def _count_not_before_11(fenotype):
+def _count_not_before_11(day_masks):
     """
     Count days with first activities not before 11.
 
-    :param list fenotype: scored fenotype
+    :param list day_masks: scored timeline
     :return int: "not before 11" occurances
     """
-    count = 0
-    for day_list in fenotype:
-        if day_list and day_list[0][0] >= _HOUR_11:
-            count += 1
-    return count
+    return sum(1 for day_mask in day_masks if day_mask and not day_mask & _BEFORE_11_MASK)
 
 
-def _count_not_after_15(fenotype):
+def _count_not_after_15(day_masks):
     """
     Count days with last activities not after 15.
 
-    :param list fenotype: scored fenotype
+    :param list day_masks: scored timeline
     :return int: "not after 15" occurances
     """
-    count = 0
-    for day_list in fenotype:
-        if day_list and day_list[-1][0] <= _HOUR_15:
-            count += 1
-    return count
+    return sum(1 for day_mask in day_masks if day_mask and not day_mask & _AFTER_15_MASK)
 
 
 def _count_2h_windows(fenotype):
     """
     Count 2h+ windows.
 
-    :param list fenotype: scored fenotype
+    :param list fenotype: scored minute fenotype
     :return int: 2h+ windows count
     """
     count = 0
     for day_list in fenotype:
         if len(day_list) > 2:
             for index in range(len(day_list) - 1):
-                if day_list[index+1][0] - day_list[index][1] >= _SPAN_2H:
+                if day_list[index+1][0] - day_list[index][1] >= _MINUTES_2H:
                     count += 1
     return count
 
 
-def _count_free_days(fenotype):
+def _count_free_days(day_masks):
     """
     Count free days.
 
-    :param list fenotype: scored fenotype
+    :param list day_masks: scored timeline
     :return int: free day count
     """
-    count = 0
-    for day_list in fenotype:
-        if not day_list:
-            count += 1
-    return count
+    return sum(1 for day_mask in day_masks if not day_mask)
 
 
-def rate_chromosome(chromosome, scoring_values):
+def scoring_weights(scoring_values):
     """
-    Calculate rating for chomosome.
+    Get scoring weights, falling back to defaults.
 
-    :param dict chromosome: chromosome to score
     :param dict scoring_values: dictionary of scoring values
-    :returns int: score of chromosome
+    :returns tuple: conflict, before 9, after 17 and 2h window penalties,
+        free day, not before 11 and not after 15 bonuses
     """
-    conflict_penalty = scoring_values.get("conflictPenalty", _DEFAULT_CONFLICT_PENALTY)
-    before_9_penalty = scoring_values.get("before9Penalty", _DEFAULT_BEFORE_9_PENALTY)
-    after_17_penalty = scoring_values.get("after17Penalty", _DEFAULT_AFTER_17_PENALTY)
-    over_2h_window_penalty = scoring_values.get(
-        "over2hWindowPenalty", _DEFAULT_OVER_2H_WINDOW_PENALTY)
+    return (scoring_values.get("conflictPenalty", _DEFAULT_CONFLICT_PENALTY),
+            scoring_values.get("before9Penalty", _DEFAULT_BEFORE_9_PENALTY),
+            scoring_values.get("after17Penalty", _DEFAULT_AFTER_17_PENALTY),
+            scoring_values.get("over2hWindowPenalty", _DEFAULT_OVER_2H_WINDOW_PENALTY),
+            scoring_values.get("freeDayBonus", _DEFAULT_FREE_DAY_BONUS),
+            scoring_values.get("notBefore11Bonus", _DEFAULT_NOT_BEFORE_11_BONUS),
+            scoring_values.get("notAfter15Bonus", _DEFAULT_NOT_AFTER_15_BONUS))
 
-    free_day_bonus = scoring_values.get("freeDayBonus", _DEFAULT_FREE_DAY_BONUS)
-    not_before_11_bonus = scoring_values.get("notBefore11Bonus", _DEFAULT_NOT_BEFORE_11_BONUS)
-    not_after_15_bonus = scoring_values.get("notAfter15Bonus", _DEFAULT_NOT_AFTER_15_BONUS)
 
-    fenotype = create_fenotype(chromosome)
+def rate_chromosome(chromosome, scoring_values, conflict_table=None, cache=None):
+    """
+    Calculate rating for chomosome.
 
-    score_conflict_penalty = conflict_penalty * _count_conflicts(fenotype)
-    score_before_9_penalty = before_9_penalty * _count_before_9(fenotype)
-    score_after_17_penalty = after_17_penalty * _count_after_17(fenotype)
+    :param dict chromosome: chromosome to score
+    :param dict scoring_values: dictionary of scoring values
+    :param ConflictTable conflict_table: precomputed conflict table used instead of
+        counting conflicts in fenotype
+    :param FitnessCache cache: fitness cache to look score up in and store it to
+    :returns int: score of chromosome
+    """
+    if cache is not None:
+        cache_key = FitnessCache.chromosome_key(chromosome)
+        cached_score = cache.get(cache_key)
+        if cached_score is not None:
+            return cached_score
+
+    conflict_penalty, before_9_penalty, after_17_penalty, over_2h_window_penalty, \
+        free_day_bonus, not_before_11_bonus, not_after_15_bonus = scoring_weights(scoring_values)
+
+    fenotype = create_minute_fenotype(chromosome)
+    day_masks = create_timeline(chromosome)
+
+    if conflict_table is not None:
+        score_conflict_penalty = conflict_penalty * conflict_table.count_conflicts(chromosome)
+    else:
+        score_conflict_penalty = conflict_penalty * _count_conflicts(fenotype)
+    score_before_9_penalty = before_9_penalty * _count_before_9(day_masks)
+    score_after_17_penalty = after_17_penalty * _count_after_17(day_masks)
     score_over_2h_window_penalty = over_2h_window_penalty * _count_2h_windows(fenotype)
 
-    score_free_day_bonus = free_day_bonus * _count_free_days(fenotype)
-    score_not_before_11_bonus = not_before_11_bonus * _count_not_before_11(fenotype)
-    score_not_after_15_bonus = not_after_15_bonus * _count_not_after_15(fenotype)
+    score_free_day_bonus = free_day_bonus * _count_free_days(day_masks)
+    score_not_before_11_bonus = not_before_11_bonus * _count_not_before_11(day_masks)
+    score_not_after_15_bonus = not_after_15_bonus * _count_not_after_15(day_masks)
 
     score = score_conflict_penalty + score_before_9_penalty + score_after_17_penalty + \
         score_over_2h_window_penalty + score_free_day_bonus + \
         score_not_before_11_bonus + score_not_after_15_bonus
 
+    if cache is not None:
+        cache.put(cache_key, score)
     return score
 
 
-def rate_population(population, scoring_values):
+def rate_population(population, scoring_values, conflict_table=None, cache=None):
     """
     Calculate rating for population.
 
     :param list population: population to score
+    :param dict scoring_values: dictionary of scoring values
+    :param ConflictTable conflict_table: precomputed conflict table
+    :param FitnessCache cache: fitness cache
     :return list: list of scores
     """
-    return [rate_chromosome(chromo, scoring_values) for chromo in population]
+    return [rate_chromosome(chromo, scoring_values, conflict_table, cache)
+            for chromo in population]
+
+
+def _concatenated_ranges(firsts, lengths):
+    """
+    Concatenate ranges of indices.
+
+    :param numpy.ndarray firsts: first index of every range
+    :param numpy.ndarray lengths: length of every range
+    :return numpy.ndarray: indices of all ranges in order
+    """
+    return np.repeat(firsts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+
+def _create_encoded_fenotype(problem, population):
+    """
+    Create fenotype of encoded chromosomes.
+    Activities of chosen groups are filtered out of day-sorted activity tables of
+    problem, so they need no sorting.
+
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray population: encoded population
+    :returns tuple: fenotype days (chromosome index times 10 plus day) and positions
+        of activities in day-sorted activity tables, sorted by both
+    """
+    chosen = np.zeros((len(population), problem.group_count), dtype=bool)
+    chosen[np.arange(len(population))[:, None], problem.global_group_indices(population)] = True
+    rows, positions = np.nonzero(chosen[:, problem.day_activity_groups])
+    return rows * DAY_COUNT + problem.day_activity_days[positions], positions
+
+
+def _group_activities(problem, groups):
+    """
+    Get activities of groups.
+
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray groups: group indices
+    :returns tuple: index in groups, day and position in day-sorted activity tables
+        of every activity
+    """
+    group_indices, days = np.nonzero((problem.group_days[groups][:, None] >> np.arange(DAY_COUNT))
+                                     & 1)
+    firsts = problem.activity_day_offsets[groups[group_indices], days]
+    lengths = problem.activity_day_offsets[groups[group_indices], days + 1] - firsts
+    return np.repeat(group_indices, lengths), np.repeat(days, lengths), \
+        problem.activity_day_ranks[_concatenated_ranges(firsts, lengths)]
+
+
+def _create_encoded_delta_fenotype(problem, parents, moved_children, old_groups, new_groups,
+                                   selection):
+    """
+    Create fenotype of selected days of encoded children from fenotype of their parents.
+    Activities of parent on selected day are kept unless they belong to old group of
+    moved gene and activities of new groups on it are added, so cost grows with size
+    of selected days and number of moved genes, not with number of groups.
+
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray parents: encoded parents, one per child or single shared parent
+    :param numpy.ndarray moved_children: child index of every moved gene
+    :param numpy.ndarray old_groups: group index of every moved gene in parent
+    :param numpy.ndarray new_groups: group index of every moved gene in child
+    :param numpy.ndarray selection: position of every (child, day) in selection of days,
+        (child_count, 10), all days touched by moved genes are selected
+    :returns tuple: fenotype days (position of day in selection) and positions of
+        activities in day-sorted activity tables, sorted by both
+    """
+    activity_count = len(problem.day_activity_groups)
+    parent_rows = np.atleast_2d(parents)
+    child_parents = np.broadcast_to(np.arange(len(parent_rows)), len(selection))
+    parent_days, parent_positions = _create_encoded_fenotype(problem, parent_rows)
+    parent_offsets = np.searchsorted(parent_days, np.arange(len(parent_rows) * DAY_COUNT + 1))
+
+    chromo_indices, days = np.nonzero(selection >= 0)
+    selected_days = child_parents[chromo_indices] * DAY_COUNT + days
+    selected_firsts = parent_offsets[selected_days]
+    lengths = parent_offsets[selected_days + 1] - selected_firsts
+    kept_indices = _concatenated_ranges(selected_firsts, lengths)
+    kept = np.ones(len(kept_indices), dtype=bool)
+
+    old_genes, old_days, old_positions = _group_activities(problem, old_groups)
+    # positions are day-sorted, so parent activities are found by their keys
+    old_indices = np.searchsorted(parent_days // DAY_COUNT * activity_count + parent_positions,
+                                  child_parents[moved_children[old_genes]] * activity_count
+                                  + old_positions)
+    old_selections = selection[moved_children[old_genes], old_days]
+    kept[old_indices - selected_firsts[old_selections]
+         + (np.cumsum(lengths) - lengths)[old_selections]] = False
+
+    new_genes, new_days, new_positions = _group_activities(problem, new_groups)
+    # kept activities are sorted already, stable sort merges few new ones into them
+    return np.divmod(np.sort(np.concatenate((
+        np.repeat(np.arange(len(days)), lengths)[kept] * activity_count
+        + parent_positions[kept_indices[kept]],
+        selection[moved_children[new_genes], new_days] * activity_count
+        + new_positions)), kind='stable'), activity_count)
+
+
+def _count_per_day(fenotype_days, occurances, day_count):
+    """
+    Sum occurances in encoded fenotype per fenotype day.
+
+    :param numpy.ndarray fenotype_days: fenotype days of occurances
+    :param numpy.ndarray occurances: boolean mask of occurances
+    :param int day_count: number of fenotype days
+    :return numpy.ndarray: occurance count per day
+    """
+    return np.bincount(fenotype_days[occurances], minlength=day_count)
+
+
+def _rate_encoded_days(problem, fenotype_days, positions, day_count, scoring_values):
+    """
+    Calculate conflicts and scores of days of encoded fenotype.
+
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray fenotype_days: fenotype day of every activity, ascending
+    :param numpy.ndarray positions: positions of activities in day-sorted activity tables
+    :param int day_count: number of fenotype days
+    :param dict scoring_values: dictionary of scoring values
+    :return tuple: conflict count and score without conflict penalty of every day
+    """
+    _, before_9_penalty, after_17_penalty, over_2h_window_penalty, \
+        free_day_bonus, not_before_11_bonus, not_after_15_bonus = scoring_weights(scoring_values)
+
+    starts = problem.day_activity_starts[positions]
+    ends = problem.day_activity_ends[positions]
+    day_lengths = np.bincount(fenotype_days, minlength=day_count)
+
+    is_first = np.ones(len(fenotype_days), dtype=bool)
+    is_first[1:] = fenotype_days[1:] != fenotype_days[:-1]
+    is_last = np.ones(len(fenotype_days), dtype=bool)
+    is_last[:-1] = is_first[1:]
+    is_window = (fenotype_days[:-1] == fenotype_days[1:]) \
+        & (starts[1:] - ends[:-1] >= _MINUTES_2H) & (day_lengths[fenotype_days[:-1]] > 2)
+
+    conflicts = count_day_conflicts(fenotype_days, starts, ends, day_count)
+    return conflicts, before_9_penalty * _count_per_day(
+        fenotype_days, is_first & (starts < _MINUTE_9), day_count) + \
+        after_17_penalty * _count_per_day(
+            fenotype_days, is_last & (starts > _MINUTE_17), day_count) + \
+        over_2h_window_penalty * _count_per_day(fenotype_days[:-1], is_window, day_count) + \
+        free_day_bonus * (day_lengths == 0) + \
+        not_before_11_bonus * _count_per_day(
+            fenotype_days, is_first & (starts >= _MINUTE_11), day_count) + \
+        not_after_15_bonus * _count_per_day(
+            fenotype_days, is_last & (starts <= _MINUTE_15), day_count)
+
+
+def combine_breakdown(conflicts, day_scores, scoring_values):
+    """
+    Combine score breakdown into scores.
+
+    :param numpy.ndarray conflicts: conflict counts per day
+    :param numpy.ndarray day_scores: day scores
+    :param dict scoring_values: dictionary of scoring values
+    :return numpy.ndarray: array of scores
+    """
+    return scoring_weights(scoring_values)[0] * conflicts.sum(axis=-1) + day_scores.sum(axis=-1)
+
+
+def rate_encoded_breakdown(problem, population, scoring_values):
+    """
+    Calculate score breakdown of whole encoded population.
+    Score of chromosome is conflict penalty times conflict count plus sum of day scores.
+
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray population: encoded population to score
+    :param dict scoring_values: dictionary of scoring values
+    :return tuple: conflict counts and scores of all remaining terms, both per day
+        of shape (pop_size, 10)
+    """
+    pop_size = len(population)
+    fenotype_days, positions = _create_encoded_fenotype(problem, population)
+    conflicts, day_scores = _rate_encoded_days(problem, fenotype_days, positions,
+                                               pop_size * DAY_COUNT, scoring_values)
+    return conflicts.reshape(pop_size, DAY_COUNT), day_scores.reshape(pop_size, DAY_COUNT)
+
+
+def rate_encoded_delta(problem, parents, parent_conflicts, parent_day_scores, children,
+                       scoring_values, changed=None):
+    """
+    Calculate rating of encoded children differing from their parents in few genes.
+    Conflicts and scores of days touched by old or new groups of changed genes are
+    recomputed (conflicts never span days), the rest of breakdown is taken from parents.
+    Children of small problems are rated whole, see _MIN_DELTA_ACTIVITIES.
+
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray parents: encoded parents (single parent is shared by all children)
+    :param numpy.ndarray parent_conflicts: conflict counts per day of parents
+    :param numpy.ndarray parent_day_scores: day scores of parents
+    :param numpy.ndarray children: encoded children to score
+    :param dict scoring_values: dictionary of scoring values
+    :param numpy.ndarray changed: boolean mask of changed genes, compared if not given
+    :return tuple: array of scores, conflict counts per day and day scores of children
+    """
+    # children have course_count / group_count of all activities on average
+    if len(children) * problem.course_count * len(problem.day_activity_groups) \
+            < _MIN_DELTA_ACTIVITIES * problem.group_count:
+        conflicts, day_scores = rate_encoded_breakdown(problem, children, scoring_values)
+        return combine_breakdown(conflicts, day_scores, scoring_values), conflicts, day_scores
+
+    parents_view = np.broadcast_to(parents, children.shape)
+    moved = parents_view != children
+    if changed is not None:
+        moved &= changed
+    moved_children, moved_courses = np.nonzero(moved)
+    old_groups = parents_view[moved_children, moved_courses] \
+        + problem.group_offsets[moved_courses]
+    new_groups = children[moved_children, moved_courses] + problem.group_offsets[moved_courses]
+
+    gene_indices, gene_days = np.nonzero(((problem.group_days[old_groups]
+                                           | problem.group_days[new_groups])[:, None]
+                                          >> np.arange(DAY_COUNT)) & 1)
+    touched = np.bincount(moved_children[gene_indices] * DAY_COUNT + gene_days,
+                          minlength=len(children) * DAY_COUNT).reshape(-1, DAY_COUNT) > 0
+    selection = np.where(touched, np.cumsum(touched).reshape(touched.shape) - 1, -1)
+    fenotype_days, positions = _create_encoded_delta_fenotype(
+        problem, parents, moved_children, old_groups, new_groups, selection)
+
+    conflicts = np.array(np.broadcast_to(parent_conflicts, (len(children), DAY_COUNT)))
+    day_scores = np.array(np.broadcast_to(parent_day_scores, (len(children), DAY_COUNT)))
+    conflicts[touched], day_scores[touched] = _rate_encoded_days(
+        problem, fenotype_days, positions, np.count_nonzero(touched), scoring_values)
+
+    return combine_breakdown(conflicts, day_scores, scoring_values), conflicts, day_scores
+
+
+def _rate_encoded_population(problem, population, scoring_values):
+    """
+    Calculate rating for whole encoded population at once.
+
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray population: encoded population to score
+    :param dict scoring_values: dictionary of scoring values
+    :return numpy.ndarray: array of scores
+    """
+    conflicts, day_scores = rate_encoded_breakdown(problem, population, scoring_values)
+    return combine_breakdown(conflicts, day_scores, scoring_values)
+
+
+def rate_encoded_population(problem, population, scoring_values, cache=None, rater=None):
+    """
+    Calculate rating for whole encoded population at once.
+    Gives the same scores as rate_population on decoded population.
+
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray population: encoded population to score
+    :param dict scoring_values: dictionary of scoring values
+    :param FitnessCache cache: fitness cache, only missed chromosomes are rated
+    :param ParallelRater rater: worker pool rating chromosomes instead of calling process
+    :return numpy.ndarray: array of scores
+    """
+    if rater is not None:
+        rate = rater.rate
+    else:
+        def rate(chromosomes):
+            return _rate_encoded_population(problem, chromosomes, scoring_values)
+
+    if cache is None:
+        return rate(population)
+
+    cache_keys = [FitnessCache.encoded_chromosome_key(chromo) for chromo in population]
+    scores = [cache.get(cache_key) for cache_key in cache_keys]
+    missed_indices = [index for index, score in enumerate(scores) if score is None]
+    if missed_indices:
+        missed_scores = rate(population[missed_indices]).tolist()
+        for index, score in zip(missed_indices, missed_scores):
+            scores[index] = score
+            cache.put(cache_keys[index], score)
+    return np.array(scores)
+
+
+def score_upper_bound(problem, scoring_values):
+    """
+    Calculate upper bound of score of any chromosome of problem: every day gets the best
+    of its bonuses it can get (free day if no course forces activities on it, not before 11
+    and not after 15 if any group has activities on it) and no penalties.
+
+    :param CompiledProblem problem: compiled problem
+    :param dict scoring_values: dictionary of scoring values
+    :return float: upper bound of score, infinity if any penalty is positive
+    """
+    weights = scoring_weights(scoring_values)
+    if max(weights[:4]) > 0:
+        return float('inf')
+    _, _, _, _, free_day_bonus, not_before_11_bonus, not_after_15_bonus = weights
+
+    # days every group of some course has activities on
+    forced_days = int(np.bitwise_or.reduce(
+        np.bitwise_and.reduceat(problem.group_days, problem.group_offsets))) \
+        if problem.course_count else 0
+    possible_days = int(np.bitwise_or.reduce(problem.group_days)) if problem.group_count else 0
+    busy_day_bonus = max(0, not_before_11_bonus) + max(0, not_after_15_bonus)
+
+    bound = 0
+    for day in range(DAY_COUNT):
+        day_bit = 1 << day
+        day_bounds = []
+        if not forced_days & day_bit:
+            day_bounds.append(free_day_bonus)
+        if possible_days & day_bit:
+            day_bounds.append(busy_day_bonus)
+        bound += max(day_bounds)
+    return bound
@@ -1,11 +1,18 @@
 """
 Module containing models used by genetic algorithm/
 """
+from tui_gen.models.conflict_table import ConflictTable
 from tui_gen.models.group import Group
 
-def parse_raw_course_dict(raw_course_dict):
+def parse_raw_course_dict(raw_course_dict, deduplicate=False):
     """
     Parse raw dictionary into dictionary of course name - list of group objects.
+    Groups given in optional "locked" dictionary of course name - group name are
+    pinned, see lock_groups. Groups are deduplicated before locking, so locked group
+    may be named by any of its equivalents.
+    :param dict raw_course_dict: raw, json-loaded problem
+    :param bool deduplicate: whether to collapse equivalent groups, see deduplicate_groups
+    :returns dict: problem dictionary
     """
     prepared_course_dict = {}
     for course_name, groups_dict in raw_course_dict['courses'].items():
@@ -13,4 +20,84 @@ def parse_raw_course_dict(raw_course_dict):
         for group_name, group_period_list in groups_dict.items():
             prepared_groups_list.append(Group.list_factory(group_name, group_period_list))
         prepared_course_dict[course_name] = prepared_groups_list
+    if deduplicate:
+        prepared_course_dict = deduplicate_groups(prepared_course_dict)
+    if raw_course_dict.get('locked'):
+        prepared_course_dict = lock_groups(prepared_course_dict, raw_course_dict['locked'])
     return prepared_course_dict
+
+
+def deduplicate_groups(problem_dict):
+    """
+    Collapse groups of the same course with identical activities in two-week fenotype
+    into first of them. Such groups score the same in every rating, so keeping one
+    shrinks search space without losing solutions. Names of collapsed groups are kept
+    in equivalent_names of representative.
+    :param dict problem_dict: problem dictionary
+    :returns dict: problem dictionary with new representative group objects
+    """
+    deduplicated_dict = {}
+    for course_name, group_list in problem_dict.items():
+        equivalent_groups = {}
+        for group in group_list:
+            equivalent_groups.setdefault(tuple(sorted(group.activities())), []).append(group)
+        deduplicated_dict[course_name] = [
+            Group(groups[0].name, groups[0].period_list,
+                  groups[0].equivalent_names + [name for group in groups[1:]
+                                                for name in [group.name] + group.equivalent_names])
+            for groups in equivalent_groups.values()]
+    return deduplicated_dict
+
+
+def _prune_overlapping_groups(problem_dict):
+    """
+    Drop groups conflicting with group of single group course, as long as course keeps
+    any group. Courses left with single group prune others in turn. Groups conflict
+    when ConflictTable (and so rating) counts conflicts between them.
+    :param dict problem_dict: problem dictionary, changed in place
+    """
+    conflict_table = ConflictTable([group for group_list in problem_dict.values()
+                                    for group in group_list])
+    pinned_courses = set()
+    while True:
+        new_pinned_courses = [course_name for course_name, group_list in problem_dict.items()
+                              if len(group_list) == 1 and course_name not in pinned_courses]
+        if not new_pinned_courses:
+            return
+        pinned_courses.update(new_pinned_courses)
+        conflicting_indices = set()
+        for course_name in new_pinned_courses:
+            conflicting_indices.update(conflict_table.conflicting_groups(
+                conflict_table.group_indices[problem_dict[course_name][0]]).tolist())
+        for course_name, group_list in problem_dict.items():
+            if course_name in pinned_courses:
+                continue
+            kept_groups = [group for group in group_list
+                           if conflict_table.group_indices[group] not in conflicting_indices]
+            if kept_groups:
+                problem_dict[course_name] = kept_groups
+
+
+def lock_groups(problem_dict, locked_groups):
+    """
+    Pin groups of courses, leaving locked course with its group only, so it is no longer
+    searched. Groups of other courses conflicting with pinned groups (including groups of
+    courses having single group) are dropped, unless course would be left without groups.
+    Group can be given by name of any of its equivalents, see deduplicate_groups.
+    :param dict problem_dict: problem dictionary
+    :param dict locked_groups: dictionary of course name - group name
+    :returns dict: problem dictionary with pinned and pruned group lists
+    """
+    locked_dict = {course_name: list(group_list)
+                   for course_name, group_list in problem_dict.items()}
+    for course_name, group_name in locked_groups.items():
+        if course_name not in locked_dict:
+            raise ValueError("Unknown locked course {}".format(course_name))
+        matching_groups = [group for group in locked_dict[course_name]
+                           if group_name in [group.name] + group.equivalent_names]
+        if not matching_groups:
+            raise ValueError("Unknown group {} of locked course {}".format(
+                group_name, course_name))
+        locked_dict[course_name] = matching_groups[:1]
+    _prune_overlapping_groups(locked_dict)
+    return locked_dict
@@ -0,0 +1,162 @@
+"""
+Module containing class representing problem compiled into numbered courses and groups.
+"""
+import numpy as np
+
+from tui_gen.models.conflict_table import ConflictTable
+from tui_gen.models.timeline import DAY_COUNT
+
+
+class CompiledProblem(object):
+    """
+    Class representing problem compiled into numbered courses and groups.
+
+    Encoded chromosome is a vector of group indices (one per course, in order of
+    course_names), encoded population is a matrix of shape (pop_size, course_count).
+    """
+
+    def __init__(self, problem_dict):
+        self.course_names = list(problem_dict.keys())
+        self.course_groups = [list(problem_dict[course_name])
+                              for course_name in self.course_names]
+        self.course_count = len(self.course_names)
+        self.group_counts = np.array([len(group_list) for group_list in self.course_groups],
+                                     dtype=np.int64)
+        self.group_offsets = np.concatenate(
+            ([0], np.cumsum(self.group_counts)[:-1])).astype(np.int64)
+        # course indices sorted by course name, order of dictionary chromosome operators
+        self.sorted_course_order = np.array(
+            sorted(range(self.course_count), key=self.course_names.__getitem__), dtype=np.int64)
+        # courses with alternative groups, the only search dimensions
+        self.free_courses = np.flatnonzero(self.group_counts > 1)
+        self.groups = [group for group_list in self.course_groups for group in group_list]
+        self.group_count = len(self.groups)
+        self.group_courses = np.repeat(np.arange(self.course_count), self.group_counts)
+        self._group_indices = [{group: index for index, group in enumerate(group_list)}
+                               for group_list in self.course_groups]
+        self._compile_activity_tables()
+        self.conflict_table = ConflictTable(self.groups)
+
+    def _compile_activity_tables(self):
+        """
+        Compile flat tables of group activities (start minute, end minute).
+        Activities are sorted by group and fenotype day (odd week first), activities
+        of group on given day are stored between activity_day_offsets[group, day]
+        and activity_day_offsets[group, day + 1]. group_days holds bitset of days
+        group has any activities on.
+
+        Activities of all groups are also sorted by day, start and end (day_activity_*
+        tables), activities of given day are stored between day_activity_offsets[day]
+        and day_activity_offsets[day + 1], so fenotype of any selection of groups is
+        filtered from them already sorted. activity_day_ranks holds position of every
+        activity (in group order) in day-sorted tables.
+        """
+        activity_lists = [sorted(group.activities()) for group in self.groups]
+        activities = np.array([activity for activity_list in activity_lists
+                               for activity in activity_list], dtype=np.int64).reshape(-1, 3)
+        self.activity_starts = activities[:, 1]
+        self.activity_ends = activities[:, 2]
+
+        self.activity_day_offsets = np.zeros((self.group_count, DAY_COUNT + 1), dtype=np.int64)
+        self.group_days = np.zeros(self.group_count, dtype=np.int64)
+        activity_offset = 0
+        for group_index, activity_list in enumerate(activity_lists):
+            day_counts = np.bincount(np.array([day for day, _, _ in activity_list], dtype=np.int64),
+                                     minlength=DAY_COUNT)
+            self.activity_day_offsets[group_index] = activity_offset + np.concatenate(
+                ([0], np.cumsum(day_counts)))
+            self.group_days[group_index] = int(np.dot(day_counts > 0, 1 << np.arange(DAY_COUNT)))
+            activity_offset += len(activity_list)
+
+        activity_days = activities[:, 0]
+        day_order = np.lexsort((self.activity_ends, self.activity_starts, activity_days))
+        self.day_activity_groups = np.repeat(
+            np.arange(self.group_count), [len(activity_list) for activity_list in activity_lists]
+        )[day_order]
+        self.day_activity_days = activity_days[day_order]
+        self.day_activity_starts = self.activity_starts[day_order]
+        self.day_activity_ends = self.activity_ends[day_order]
+        self.day_activity_offsets = np.searchsorted(self.day_activity_days,
+                                                    np.arange(DAY_COUNT + 1))
+        self.activity_day_ranks = np.empty_like(day_order)
+        self.activity_day_ranks[day_order] = np.arange(len(day_order))
+
+    def encode_chromosome(self, chromosome):
+        """
+        Encode chromosome into vector of group indices.
+        :param dict chromosome: chromosome to encode
+        :returns numpy.ndarray: encoded chromosome
+        """
+        return np.array([self._group_indices[course_index][chromosome[course_name]]
+                         for course_index, course_name in enumerate(self.course_names)],
+                        dtype=np.int64)
+
+    def decode_chromosome(self, encoded_chromosome):
+        """
+        Decode vector of group indices into chromosome.
+        :param numpy.ndarray encoded_chromosome: encoded chromosome
+        :returns dict: chromosome
+        """
+        return {
+            course_name: self.course_groups[course_index][group_index]
+            for course_index, (course_name, group_index)
+            in enumerate(zip(self.course_names, encoded_chromosome.tolist()))
+        }
+
+    def encode_population(self, population):
+        """
+        Encode population into matrix of group indices.
+        :param list population: population to encode
+        :returns numpy.ndarray: encoded population
+        """
+        encoded_population = np.empty((len(population), self.course_count), dtype=np.int64)
+        for chromo_index, chromo in enumerate(population):
+            encoded_population[chromo_index] = self.encode_chromosome(chromo)
+        return encoded_population
+
+    def decode_population(self, encoded_population):
+        """
+        Decode matrix of group indices into population.
+        :param numpy.ndarray encoded_population: encoded population
+        :returns list: population
+        """
+        return [self.decode_chromosome(encoded_chromo) for encoded_chromo in encoded_population]
+
+    def global_group_indices(self, encoded_population):
+        """
+        Translate per-course group indices into indices of groups list.
+        :param numpy.ndarray encoded_population: encoded population (or chromosome)
+        :returns numpy.ndarray: global group indices of the same shape
+        """
+        return encoded_population + self.group_offsets
+
+    def random_population(self, size, rng=None):
+        """
+        Create random encoded population.
+        :param int size: population size
+        :param numpy.random.Generator rng: random generator, fresh one if not given
+        :returns numpy.ndarray: randomly created encoded population
+        """
+        return np.random.default_rng(rng).integers(
+            0, self.group_counts, size=(size, self.course_count), dtype=np.int64)
+
+    def course_neighbours(self, encoded_chromosome, courses):
+        """
+        Create all chromosomes differing from encoded chromosome in group of one of courses.
+        :param numpy.ndarray encoded_chromosome: encoded chromosome
+        :param numpy.ndarray courses: indices of courses to change
+        :returns tuple: encoded neighbours and boolean mask of their changed genes
+        """
+        neighbour_courses = np.repeat(courses, self.group_counts[courses])
+        neighbour_groups = np.concatenate(
+            [np.arange(self.group_counts[course]) for course in courses]) \
+            if len(courses) else np.zeros(0, dtype=np.int64)
+        kept = neighbour_groups != encoded_chromosome[neighbour_courses]
+        neighbour_courses, neighbour_groups = neighbour_courses[kept], neighbour_groups[kept]
+        neighbour_indices = np.arange(len(neighbour_courses))
+
+        neighbours = np.repeat(encoded_chromosome[None, :], len(neighbour_courses), axis=0)
+        neighbours[neighbour_indices, neighbour_courses] = neighbour_groups
+        changed = np.zeros(neighbours.shape, dtype=bool)
+        changed[neighbour_indices, neighbour_courses] = True
+        return neighbours, changed
@@ -0,0 +1,163 @@
+"""
+Module containing class representing table of conflicts between groups.
+"""
+import numpy as np
+
+from tui_gen.models.timeline import DAY_COUNT
+
+_LOOKUP_CHUNK_SIZE = 1 << 22
+_SORT_KEY_BASE = 2048
+
+
+def _conflicting_pairs(day_keys, starts, ends):
+    """
+    Find overlapping pairs of activities sorted by day, start and end. Activity conflicts
+    with every later activity of its day starting before it ends, unless later activity
+    also ends before it does (the same as pairs are compared in _count_conflicts of rating
+    modules). Only such candidate pairs are compared.
+    :param numpy.ndarray day_keys: ascending day keys, multiples of _SORT_KEY_BASE
+    :param numpy.ndarray starts: start minutes
+    :param numpy.ndarray ends: end minutes
+    :returns tuple: indices of earlier and later activities of pairs
+    """
+    # number of later activities of the same day starting before activity ends
+    reach = np.searchsorted(day_keys + starts, day_keys + ends, side='right') \
+        - np.arange(len(starts)) - 1
+    pairs_0, pairs_1 = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+    active = np.flatnonzero(reach > 0)
+    shift = 1
+    while len(active):
+        conflicting = active[ends[active + shift] >= ends[active]]
+        pairs_0.append(conflicting)
+        pairs_1.append(conflicting + shift)
+        shift += 1
+        active = active[reach[active] >= shift]
+    return np.concatenate(pairs_0), np.concatenate(pairs_1)
+
+
+def count_day_conflicts(day_ids, starts, ends, day_count):
+    """
+    Count conflicts per day. Runs of activities with the same period always conflict
+    with each other, so they are compared with other runs at once.
+    :param numpy.ndarray day_ids: day id of every activity, activities of every day are
+        stored together, sorted by start and end
+    :param numpy.ndarray starts: start minutes
+    :param numpy.ndarray ends: end minutes
+    :param int day_count: number of days
+    :returns numpy.ndarray: conflict count per day
+    """
+    is_first = np.ones(len(day_ids), dtype=bool)
+    is_first[1:] = day_ids[1:] != day_ids[:-1]
+    is_run_first = is_first.copy()
+    is_run_first[1:] |= (starts[1:] != starts[:-1]) | (ends[1:] != ends[:-1])
+    run_firsts = np.flatnonzero(is_run_first)
+    run_lengths = np.diff(np.append(run_firsts, len(starts)))
+    run_days = day_ids[run_firsts]
+
+    # days are stored together, but not necessarily in order, so keys number them again
+    runs_0, runs_1 = _conflicting_pairs((np.cumsum(is_first)[run_firsts] - 1) * _SORT_KEY_BASE,
+                                        starts[run_firsts], ends[run_firsts])
+    return (np.bincount(run_days, weights=run_lengths * (run_lengths - 1) // 2,
+                        minlength=day_count)
+            + np.bincount(run_days[runs_0], weights=run_lengths[runs_0] * run_lengths[runs_1],
+                          minlength=day_count)).astype(np.int64)
+
+
+class ConflictTable(object):
+    """
+    Class representing table of conflicts between groups.
+
+    Entry (a, b) holds number of overlapping activity pairs of groups a and b in
+    two-week fenotype (parity expanded), entry (a, a) holds number of overlapping
+    activity pairs inside group a. Conflict count of chromosome is sum of entries
+    over all pairs of chosen groups, including each chosen group paired with itself.
+
+    Table is sparse, entries (a, a) are stored in diagonal, nonzero entries (a, b) of
+    different groups in compressed rows: groups conflicting with group a are
+    indices[indptr[a]:indptr[a + 1]] (ascending), their entries are counts at the
+    same positions.
+    """
+
+    def __init__(self, groups):
+        self.group_indices = {group: index for index, group in enumerate(groups)}
+        self.group_count = len(groups)
+
+        activity_list = sorted((day, minute_start, minute_end, group_index)
+                               for group_index, group in enumerate(groups)
+                               for day, minute_start, minute_end in group.activities())
+        activities = np.array(activity_list, dtype=np.int64).reshape(-1, 4)
+        self._activity_days, self._activity_starts, self._activity_ends, \
+            self._activity_groups = activities.T
+        pairs_0, pairs_1 = _conflicting_pairs(self._activity_days * _SORT_KEY_BASE,
+                                              self._activity_starts, self._activity_ends)
+        group_indices_0 = self._activity_groups[pairs_0]
+        group_indices_1 = self._activity_groups[pairs_1]
+
+        inner = group_indices_0 == group_indices_1
+        self.diagonal = np.bincount(group_indices_0[inner],
+                                    minlength=self.group_count).astype(np.int32)
+        crossed_0, crossed_1 = group_indices_0[~inner], group_indices_1[~inner]
+        keys, counts = np.unique(np.concatenate((crossed_0 * self.group_count + crossed_1,
+                                                 crossed_1 * self.group_count + crossed_0)),
+                                 return_counts=True)
+        rows = keys // self.group_count
+        self.indptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(rows, minlength=self.group_count)))).astype(np.int64)
+        self.indices = (keys % self.group_count).astype(np.int32)
+        self.counts = counts.astype(np.int32)
+
+    def rows(self, groups):
+        """
+        Get dense rows of table.
+        :param numpy.ndarray groups: group indices of rows
+        :returns numpy.ndarray: entries of shape (len(groups), group_count)
+        """
+        groups = np.asarray(groups, dtype=np.int64)
+        lengths = self.indptr[groups + 1] - self.indptr[groups]
+        positions = np.arange(lengths.sum()) + np.repeat(
+            self.indptr[groups] - np.cumsum(lengths) + lengths, lengths)
+        dense_rows = np.zeros((len(groups), self.group_count), dtype=np.int64)
+        dense_rows[np.repeat(np.arange(len(groups)), lengths), self.indices[positions]] = \
+            self.counts[positions]
+        dense_rows[np.arange(len(groups)), groups] = self.diagonal[groups]
+        return dense_rows
+
+    def conflicting_groups(self, group_index):
+        """
+        Get groups conflicting with group, not including group itself.
+        :param int group_index: group index
+        :returns numpy.ndarray: ascending indices of conflicting groups
+        """
+        return self.indices[self.indptr[group_index]:self.indptr[group_index + 1]]
+
+    def count_conflicts(self, chromosome):
+        """
+        Count conflicts of chromosome.
+        :param dict chromosome: chromosome to count conflicts for
+        :returns int: conflict occurances
+        """
+        chosen_indices = np.array([self.group_indices[group] for group in chromosome.values()],
+                                  dtype=np.int64)
+        return int(self.count_encoded_conflicts(chosen_indices[None, :])[0])
+
+    def count_encoded_conflicts(self, group_indices):
+        """
+        Count conflicts of whole population given as matrix of chosen group indices.
+        Activities of chosen groups are filtered out of sorted activities and only
+        their candidate pairs are compared, see count_day_conflicts.
+        :param numpy.ndarray group_indices: indices of chosen groups, (pop_size, course_count)
+        :returns numpy.ndarray: conflict occurances per chromosome
+        """
+        pop_size = len(group_indices)
+        counts = np.empty(pop_size, dtype=np.int64)
+        chunk_size = max(1, _LOOKUP_CHUNK_SIZE // max(1, len(self._activity_groups)))
+        for chunk_start in range(0, pop_size, chunk_size):
+            chunk = group_indices[chunk_start:chunk_start + chunk_size]
+            chosen = np.zeros((len(chunk), self.group_count), dtype=bool)
+            chosen[np.arange(len(chunk))[:, None], chunk] = True
+            rows, activity_indices = np.nonzero(chosen[:, self._activity_groups])
+            counts[chunk_start:chunk_start + chunk_size] = count_day_conflicts(
+                rows * DAY_COUNT + self._activity_days[activity_indices],
+                self._activity_starts[activity_indices], self._activity_ends[activity_indices],
+                len(chunk) * DAY_COUNT).reshape(len(chunk), DAY_COUNT).sum(axis=1)
+        return counts
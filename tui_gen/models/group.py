@@ -1,15 +1,27 @@
 """
 Module containing class representing activity group.
 """
+from tui_gen.models import timeline
 from tui_gen.models.period import Period
 
 class Group(object):
     """
     Class representing activity group.
+
+    Besides period list, group carries precomputed two-week timeline mask
+    of activity starts (see timeline module).
+    equivalent_names holds names of groups with the same activities collapsed into
+    this one (see models.deduplicate_groups).
     """
-    def __init__(self, name, period_list):
+    def __init__(self, name, period_list, equivalent_names=None):
         self.name = name
         self.period_list = period_list
+        self.equivalent_names = equivalent_names or []
+        self._activity_list = [(day, period.minute_start, period.minute_end)
+                               for period in period_list for day in period.fenotype_days()]
+        self.start_mask = 0
+        for day, minute_start, _ in self._activity_list:
+            self.start_mask |= timeline.activity_start_mask(day, minute_start)
 
     @staticmethod
     def list_factory(name, list_raw):
@@ -19,3 +31,11 @@ class Group(object):
         :returns Group: group object
         """
         return Group(name, [Period.dict_factory(period_dict) for period_dict in list_raw])
+
+    def activities(self):
+        """
+        List group activities in two-week fenotype.
+        Days are numbered 0-9, odd week first, times are given in minutes.
+        :returns list: list of tuples of (day, start minute, end minute)
+        """
+        return self._activity_list
@@ -17,6 +17,22 @@ class Period(object):
         self.time_start = time_start
         self.time_end = time_end
         self.parity = parity
+        self.minute_start = time_start.hour * 60 + time_start.minute
+        self.minute_end = time_end.hour * 60 + time_end.minute
+
+    def fenotype_days(self):
+        """
+        List days of two-week fenotype period takes place in.
+        Days are numbered 0-9, odd week first.
+        :returns list: list of fenotype days
+        """
+        dow_zero_based = self.dow - 1
+        days = []
+        if self.parity != Parity.EVEN:
+            days.append(dow_zero_based)
+        if self.parity != Parity.ODD:
+            days.append(dow_zero_based + 5)
+        return days
 
     @staticmethod
     def dict_factory(dict_raw):
@@ -0,0 +1,43 @@
+"""
+Module containing two-week timeline bitmask utilities.
+
+Timeline mask is an integer with one bit per slot of two-week fenotype:
+days are numbered 0-9 (odd week first), each day holds DAY_SLOT_COUNT slots.
+"""
+DAY_COUNT = 10
+SLOT_MINUTES = 1
+DAY_SLOT_COUNT = 24 * 60 // SLOT_MINUTES
+DAY_FULL_MASK = (1 << DAY_SLOT_COUNT) - 1
+
+
+def day_range_mask(minute_from, minute_to, day=0):
+    """
+    Create mask of slots between two times of single day.
+    :param int minute_from: first minute (inclusive)
+    :param int minute_to: last minute (exclusive)
+    :param int day: fenotype day
+    :returns int: timeline mask
+    """
+    slot_from = minute_from // SLOT_MINUTES
+    slot_to = max(slot_from, -(-minute_to // SLOT_MINUTES))
+    return ((1 << (slot_to - slot_from)) - 1) << (day * DAY_SLOT_COUNT + slot_from)
+
+
+def activity_start_mask(day, minute_start):
+    """
+    Create mask with single slot marking activity start.
+    :param int day: fenotype day
+    :param int minute_start: activity start minute
+    :returns int: timeline mask
+    """
+    return 1 << (day * DAY_SLOT_COUNT + minute_start // SLOT_MINUTES)
+
+
+def split_days(timeline_mask):
+    """
+    Split timeline mask into single day masks.
+    :param int timeline_mask: timeline mask
+    :returns list: list of day masks (slots of each day starting from bit 0)
+    """
+    return [(timeline_mask >> (day * DAY_SLOT_COUNT)) & DAY_FULL_MASK
+            for day in range(DAY_COUNT)]
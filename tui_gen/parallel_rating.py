@@ -0,0 +1,91 @@
+"""
+Module containing process pool rating of encoded populations.
+"""
+from multiprocessing import Pool
+
+import numpy as np
+
+from tui_gen.gen_alg.rating import rate_encoded_population
+
+# problem data of worker process, set once by pool initializer
+_worker_problem = None
+_worker_scoring_values = None
+
+
+def _init_worker(problem, scoring_values):
+    """
+    Store problem data in worker process.
+    :param CompiledProblem problem: compiled problem
+    :param dict scoring_values: dictionary of scoring values
+    """
+    global _worker_problem, _worker_scoring_values  # pylint: disable=global-statement
+    _worker_problem = problem
+    _worker_scoring_values = scoring_values
+
+
+def _rate_chunk(population_chunk):
+    """
+    Rate population chunk in worker process.
+    :param numpy.ndarray population_chunk: encoded chromosomes to score
+    :returns numpy.ndarray: array of scores
+    """
+    return rate_encoded_population(_worker_problem, population_chunk, _worker_scoring_values)
+
+
+def _call_with_problem(call):
+    """
+    Call function with problem data of worker process.
+    :param tuple call: function and tuple of its remaining arguments
+    :returns: function result
+    """
+    function, args = call
+    return function(_worker_problem, _worker_scoring_values, *args)
+
+
+class ParallelRater(object):
+    """
+    Class representing pool of worker processes rating encoded populations.
+
+    Compiled problem and scoring values are sent to every worker once, when pool
+    starts, so only population chunks and scores are passed on each call.
+    Rating is deterministic, so scores are the same as of serial rating.
+    Pool can also run other work needing the problem, see map_with_problem.
+    """
+
+    def __init__(self, problem, scoring_values, workers):
+        self.workers = workers
+        self._pool = Pool(workers, initializer=_init_worker,
+                          initargs=(problem, scoring_values))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def rate(self, population):
+        """
+        Rate encoded population split into one chunk per worker.
+        :param numpy.ndarray population: encoded population to score
+        :returns numpy.ndarray: array of scores
+        """
+        chunks = np.array_split(population, min(self.workers, max(1, len(population))))
+        return np.concatenate(self._pool.map(_rate_chunk, chunks))
+
+    def map_with_problem(self, function, args_list):
+        """
+        Call function in worker processes once per argument tuple.
+        Function has to be module level and take compiled problem and scoring values
+        as first two arguments.
+        :param function function: function to call
+        :param list args_list: list of tuples of remaining arguments
+        :returns list: function results, in order of argument tuples
+        """
+        return self._pool.map(_call_with_problem, [(function, args) for args in args_list])
+
+    def close(self):
+        """
+        Stop worker processes.
+        """
+        self._pool.close()
+        self._pool.join()
@@ -0,0 +1,80 @@
+"""
+Module containing timer of solver loop phases.
+"""
+from time import perf_counter
+
+import numpy as np
+
+
+class PhaseTimer(object):
+    """
+    Class representing timer of solver loop phases.
+
+    Phase time is measured from previous lap, so consecutive phases are timed with
+    one clock read each. Disabled timer does not read clock at all.
+
+        started = timer.start()
+        ...
+        started = timer.lap('crossover', started)
+        ...
+        timer.end_round()
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.totals = {}
+        self.per_round = {}
+        self._round_times = {}
+        self._round_count = 0
+
+    def start(self):
+        """
+        Read clock at start of timed phases.
+        :returns float: clock reading, 0 when timer is disabled
+        """
+        return perf_counter() if self.enabled else 0.0
+
+    def lap(self, phase, started):
+        """
+        Add time since started to phase of current round.
+        :param str phase: phase name
+        :param float started: clock reading at phase start
+        :returns float: clock reading at phase end, start of next phase
+        """
+        if not self.enabled:
+            return 0.0
+        now = perf_counter()
+        self._round_times[phase] = self._round_times.get(phase, 0.0) + now - started
+        return now
+
+    def end_round(self):
+        """
+        Close round (generation) adding its phase times to totals and per round lists.
+        """
+        if not self.enabled:
+            return
+        for phase, seconds in self._round_times.items():
+            self.totals[phase] = self.totals.get(phase, 0.0) + seconds
+            self.per_round.setdefault(phase, [0.0] * self._round_count).append(seconds)
+        for phase, round_times in self.per_round.items():
+            if phase not in self._round_times:
+                round_times.append(0.0)
+        self._round_times = {}
+        self._round_count += 1
+
+    def histogram(self, phase, bins=10):
+        """
+        Create histogram of per round times of phase.
+        :param str phase: phase name
+        :param int bins: number of bins
+        :returns tuple: bin counts and bin edges (in seconds), see numpy.histogram
+        """
+        return np.histogram(self.per_round.get(phase, []), bins=bins)
+
+    def summary(self):
+        """
+        Format phase totals.
+        :returns str: total time of every phase
+        """
+        return ", ".join("{} {:.3f} s".format(phase, seconds)
+                         for phase, seconds in self.totals.items())
@@ -0,0 +1,96 @@
+"""
+Module containing progress records of solver runs and their observers.
+"""
+import math
+import sys
+from time import perf_counter
+
+import numpy as np
+
+# one record per generation (bee round), evaluations are counted from start of run
+RECORD_DTYPE = np.dtype([('generation', np.int64), ('best', np.float64), ('mean', np.float64),
+                         ('worst', np.float64), ('diversity', np.float64),
+                         ('evaluations', np.int64)])
+
+
+def population_diversity(problem, population):
+    """
+    Calculate share of genes differing from most common group of their course,
+    0 when all chromosomes are the same.
+    :param CompiledProblem problem: compiled problem
+    :param numpy.ndarray population: encoded population
+    :returns float: population diversity
+    """
+    if population.size == 0:
+        return 0.0
+    group_frequencies = np.bincount((population + problem.group_offsets).ravel(),
+                                    minlength=problem.group_count)
+    modal_frequencies = np.maximum.reduceat(group_frequencies, problem.group_offsets)
+    return 1.0 - float(modal_frequencies.mean()) / len(population)
+
+
+class ProgressRecorder(object):
+    """
+    Class representing progress records of solver run and observers notified of them.
+
+    Records are kept in preallocated structured array (see RECORD_DTYPE), which
+    doubles its capacity when full. Observers are called with every new record and
+    request early stop of run by returning True.
+    """
+
+    def __init__(self, observers=(), capacity=256):
+        self.observers = [observer for observer in observers if observer is not None]
+        self._records = np.zeros(capacity, dtype=RECORD_DTYPE)
+        self.count = 0
+
+    @property
+    def records(self):
+        """
+        Get records of run so far.
+        :returns numpy.ndarray: structured array of records
+        """
+        return self._records[:self.count]
+
+    def record(self, rating, diversity, evaluations):
+        """
+        Record generation and notify observers.
+        :param numpy.ndarray rating: ratings of generation population
+        :param float diversity: population diversity, see population_diversity
+        :param int evaluations: number of solutions rated since start of run
+        :returns bool: whether any observer requested stop
+        """
+        if self.count == len(self._records):
+            self._records = np.concatenate((self._records, np.zeros_like(self._records)))
+        record = self._records[self.count]
+        record['generation'] = self.count + 1
+        record['best'] = rating.max()
+        record['mean'] = rating.mean()
+        record['worst'] = rating.min()
+        record['diversity'] = diversity
+        record['evaluations'] = evaluations
+        self.count += 1
+        stop_requests = [observer(record) for observer in self.observers]
+        return any(stop_requests)
+
+
+class ConsoleReporter(object):
+    """
+    Class representing observer printing progress records at most once per interval,
+    so printing does not slow down runs with fast generations.
+    """
+    _LINE_TEMPLATE = ("Generation {generation}: best {best}, mean {mean:.1f}, worst {worst}, "
+                      "diversity {diversity:.3f}, evaluations {evaluations}")
+
+    def __init__(self, interval=1.0, stream=None):
+        self.interval = interval
+        self.stream = stream
+        self._last_print = -math.inf
+
+    def __call__(self, record):
+        now = perf_counter()
+        if now - self._last_print >= self.interval:
+            self._last_print = now
+            print(self._LINE_TEMPLATE.format(**{name: record[name].item()
+                                                for name in RECORD_DTYPE.names}),
+                  file=self.stream or sys.stdout)
+        return False
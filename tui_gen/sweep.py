@@ -0,0 +1,168 @@
+"""
+Module containing parallel, resumable parameter sweeps of genetic algorithm.
+
+Every run of sweep is identified by its parameters and repeat number. Finished runs
+are appended to JSONL file as soon as they complete, so interrupted sweep started
+again with the same file only performs missing runs.
+"""
+import hashlib
+import itertools
+import json
+import os
+from multiprocessing import Pool
+from statistics import mean
+
+from tui_gen.gen_alg import genetic_algorithm
+
+# problem data of worker process, set once by pool initializer
+_worker_problem_dict = None
+_worker_scoring_values = None
+
+
+def parameter_grid(param_values):
+    """
+    Create all combinations of parameter values.
+    :param dict param_values: dictionary of parameter name - list of values
+    :returns list: list of dictionaries of parameter name - value
+    """
+    names = sorted(param_values)
+    return [dict(zip(names, values))
+            for values in itertools.product(*(param_values[name] for name in names))]
+
+
+def run_key(params, repeat):
+    """
+    Create key identifying sweep run.
+    :param dict params: genetic algorithm parameters
+    :param int repeat: repeat number
+    :returns str: run key
+    """
+    return "{}#{}".format(json.dumps(params, sort_keys=True), repeat)
+
+
+def run_seed(key, base_seed=0):
+    """
+    Derive seed of sweep run from its key, so it does not change between resumes.
+    :param str key: run key
+    :param int base_seed: seed of whole sweep
+    :returns int: run seed
+    """
+    digest = hashlib.sha256("{}:{}".format(base_seed, key).encode('utf-8')).hexdigest()
+    return int(digest[:8], 16)
+
+
+def load_finished_runs(output_path):
+    """
+    Load records of finished runs, skipping line cut by interruption.
+    :param str output_path: path of JSONL results file
+    :returns list: list of run records
+    """
+    if not os.path.exists(output_path):
+        return []
+    records = []
+    with open(output_path, 'r', encoding='utf-8') as output_file:
+        for line in output_file:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def _end_last_line(output_path):
+    """
+    Terminate line cut by interruption, so new records start on their own lines.
+    :param str output_path: path of JSONL results file
+    """
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        return
+    with open(output_path, 'rb+') as output_file:
+        output_file.seek(-1, os.SEEK_END)
+        if output_file.read(1) != b"\n":
+            output_file.write(b"\n")
+
+
+def _init_worker(problem_dict, scoring_values):
+    """
+    Store problem data in worker process.
+    :param dict problem_dict: problem dictionary
+    :param dict scoring_values: dictionary of scoring values
+    """
+    global _worker_problem_dict, _worker_scoring_values  # pylint: disable=global-statement
+    _worker_problem_dict = problem_dict
+    _worker_scoring_values = scoring_values
+
+
+def _perform_run(run):
+    """
+    Perform single sweep run in worker process.
+    :param tuple run: run key, genetic algorithm parameters, repeat number and seed
+    :returns dict: run record
+    """
+    key, params, repeat, seed = run
+    report = genetic_algorithm(_worker_problem_dict, scoring_values=_worker_scoring_values,
+                               verbose=False, seed=seed, **params)
+    return {
+        'run': key,
+        'params': params,
+        'repeat': repeat,
+        'seed': seed,
+        'score': float(report.score),
+        'time': report.time_taken.total_seconds(),
+        'generations': report.generations,
+    }
+
+
+def run_sweep(problem_dict, scoring_values, param_sets, repeats, output_path, workers=None,
+              base_seed=0):
+    """
+    Run genetic algorithm repeats times for every parameter set on process pool.
+    Runs already present in output file are not repeated.
+    :param dict problem_dict: problem dictionary
+    :param dict scoring_values: dictionary of scoring values
+    :param list param_sets: list of dictionaries of genetic_algorithm parameters
+    :param int repeats: number of runs of every parameter set
+    :param str output_path: path of JSONL results file
+    :param int workers: number of worker processes, None uses all cores
+    :param int base_seed: seed of whole sweep
+    :returns list: records of all runs of sweep, ordered by parameter set and repeat
+    """
+    records = load_finished_runs(output_path)
+    finished_keys = {record['run'] for record in records}
+    pending_runs = []
+    for params in param_sets:
+        for repeat in range(repeats):
+            key = run_key(params, repeat)
+            if key not in finished_keys:
+                pending_runs.append((key, params, repeat, run_seed(key, base_seed)))
+
+    if pending_runs:
+        _end_last_line(output_path)
+        with Pool(workers, initializer=_init_worker,
+                  initargs=(problem_dict, scoring_values)) as pool, \
+                open(output_path, 'a', encoding='utf-8') as output_file:
+            for record in pool.imap_unordered(_perform_run, pending_runs):
+                output_file.write(json.dumps(record, sort_keys=True) + "\n")
+                output_file.flush()
+                records.append(record)
+
+    records_by_key = {record['run']: record for record in records}
+    return [records_by_key[run_key(params, repeat)]
+            for params in param_sets for repeat in range(repeats)]
+
+
+def summarize_sweep(records):
+    """
+    Average score, time and generation count of runs per parameter set.
+    :param list records: list of run records
+    :returns list: list of tuples of (params, mean score, mean time, mean generations),
+        ordered as parameter sets first appear in records
+    """
+    grouped_records = {}
+    for record in records:
+        grouped_records.setdefault(json.dumps(record['params'], sort_keys=True), []).append(record)
+    return [(param_records[0]['params'],
+             mean(record['score'] for record in param_records),
+             mean(record['time'] for record in param_records),
+             mean(record['generations'] for record in param_records))
+            for param_records in grouped_records.values()]
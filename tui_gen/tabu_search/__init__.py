@@ -0,0 +1,102 @@
+"""
+Module containing tabu search solver.
+
+Move reassigns one course to another group. Every iteration rates whole neighbourhood
+of current solution in one batch, by score delta against it, and makes best move not
+touching course changed during last tenure iterations, unless move gives new best score
+(aspiration). Ties are broken randomly.
+"""
+import math
+from datetime import datetime
+
+import numpy as np
+
+from tui_gen.gen_alg.rating import rate_encoded_breakdown, rate_encoded_delta, \
+    score_upper_bound, combine_breakdown
+from tui_gen.models.compiled_problem import CompiledProblem
+from tui_gen.tabu_search.tabu_search_report import TabuSearchReport
+from tui_gen.termination import Termination, TerminationReasonEnum
+
+
+def _choose_move(scores, allowed, rng):
+    """
+    Choose best allowed move, randomly among equally good ones.
+    If no move is allowed, best of all moves is chosen.
+    :param numpy.ndarray scores: scores of neighbours
+    :param numpy.ndarray allowed: boolean mask of allowed moves
+    :param numpy.random.Generator rng: random generator
+    :returns int: index of chosen neighbour
+    """
+    if not allowed.any():
+        allowed = np.ones_like(allowed)
+    allowed_scores = np.where(allowed, scores, -math.inf)
+    return int(rng.choice(np.flatnonzero(allowed_scores == allowed_scores.max())))
+
+
+def tabu_search(problem_dict, scoring_values, stale_limit, tenure=None, seed=None,
+                time_budget=None, max_evaluations=None, target_score=None):
+    """
+    Run tabu search from random solution.
+    :param dict problem_dict: problem dictionary
+    :param dict scoring_values: dictionary of scoring values
+    :param int stale_limit: max number of moves without best score improvement
+        (termination condition), None disables it
+    :param int tenure: number of iterations changed course stays tabu, square root of
+        course count if not given
+    :param seed: seed, numpy.random.SeedSequence or numpy.random.Generator of run,
+        run is not reproducible if not given
+    :param float time_budget: max run time in seconds (termination condition)
+    :param int max_evaluations: max number of rated solutions (termination condition)
+    :param float target_score: score run stops at when reached (termination condition)
+    :returns TabuSearchReport: final report
+    """
+    time_start = datetime.now()
+    rng = np.random.default_rng(seed)
+    # deadline is counted from here, so compilation is charged to time budget
+    termination = Termination(stale_limit, time_budget, max_evaluations, target_score)
+    problem = CompiledProblem(problem_dict)
+    termination.upper_bound = score_upper_bound(problem, scoring_values)
+    if tenure is None:
+        tenure = max(1, round(math.sqrt(problem.course_count)))
+    all_courses = np.arange(problem.course_count)
+    neighbourhood_size = int((problem.group_counts - 1).sum())
+
+    current = problem.random_population(1, rng)[0]
+    conflicts, day_scores = rate_encoded_breakdown(problem, current[None, :], scoring_values)
+    best_chromo = current
+    best_score = combine_breakdown(conflicts, day_scores, scoring_values)[0]
+    best_score_stale_for = 0
+    tabu_until = np.zeros(problem.course_count, dtype=np.int64)
+    iteration_count = 0
+    evaluations = 1
+    termination_reason = TerminationReasonEnum.SearchExhausted if neighbourhood_size == 0 \
+        else termination.reason(best_score, best_score_stale_for, neighbourhood_size + 1)
+    while termination_reason is None:
+        iteration_count += 1
+        neighbours, changed = problem.course_neighbours(current, all_courses)
+        scores, neighbour_conflicts, neighbour_day_scores = rate_encoded_delta(
+            problem, current, conflicts, day_scores, neighbours, scoring_values, changed)
+        evaluations += len(neighbours)
+
+        moved_courses = np.argmax(changed, axis=1)
+        move_index = _choose_move(
+            scores, (tabu_until[moved_courses] < iteration_count) | (scores > best_score), rng)
+        current = neighbours[move_index]
+        conflicts = neighbour_conflicts[move_index:move_index + 1]
+        day_scores = neighbour_day_scores[move_index:move_index + 1]
+        # course stays tabu for next tenure iterations, up to iteration_count + tenure
+        tabu_until[moved_courses[move_index]] = iteration_count + tenure
+
+        if scores[move_index] > best_score:
+            best_score_stale_for = 0
+            best_score = scores[move_index]
+            best_chromo = current
+        else:
+            best_score_stale_for += 1
+        termination_reason = termination.reason(
+            best_score, best_score_stale_for, evaluations + neighbourhood_size)
+    time_end = datetime.now()
+
+    return TabuSearchReport(problem.decode_chromosome(best_chromo), best_score,
+                            iteration_count, time_end-time_start,
+                            evaluations=evaluations, termination_reason=termination_reason)
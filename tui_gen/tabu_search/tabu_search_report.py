@@ -0,0 +1,12 @@
+"""
+Module containing class descripting tabu search solution and details.
+"""
+
+from tui_gen.gen_alg.genetic_algorithm_report import GeneticAlgorithmReport
+
+
+class TabuSearchReport(GeneticAlgorithmReport):
+    """
+    Class descripting tabu search solution and details.
+    Iterations are performed moves, evaluations are rated neighbours.
+    """
@@ -0,0 +1,67 @@
+"""
+Module containing termination conditions of solver runs.
+"""
+import math
+from enum import Enum
+from time import perf_counter
+
+
+class TerminationReasonEnum(Enum):
+    """
+    Enum of conditions ending solver run.
+    """
+    StaleLimit = 1
+    TimeBudget = 2
+    MaxEvaluations = 3
+    TargetScore = 4
+    UpperBound = 5
+    Callback = 6
+    SearchExhausted = 7
+
+
+class Termination(object):
+    """
+    Class representing termination conditions of solver run, checked after every
+    generation (bee round). Deadline is counted from creation of object.
+
+    Evaluation budget is never exceeded: run stops when next generation would rate
+    more solutions than budget has left, after at least one generation.
+    """
+
+    def __init__(self, stale_limit=None, time_budget=None, max_evaluations=None,
+                 target_score=None, upper_bound=math.inf):
+        self.stale_limit = stale_limit
+        self.deadline = perf_counter() + time_budget if time_budget is not None else math.inf
+        self.max_evaluations = max_evaluations
+        self.target_score = target_score
+        self.upper_bound = upper_bound
+
+    def evaluations_left(self, evaluations):
+        """
+        Get number of solutions run may still rate.
+        :param int evaluations: evaluations of run so far
+        :returns float: evaluations left, infinity if their number is not limited
+        """
+        if self.max_evaluations is None:
+            return math.inf
+        return self.max_evaluations - evaluations
+
+    def reason(self, best_score, stale_for, next_evaluations):
+        """
+        Check termination conditions.
+        :param float best_score: best score found so far
+        :param int stale_for: number of generations without best score improvement
+        :param int next_evaluations: evaluations of run after next generation
+        :returns TerminationReasonEnum: condition met or None if run should go on
+        """
+        if best_score >= self.upper_bound:
+            return TerminationReasonEnum.UpperBound
+        if self.target_score is not None and best_score >= self.target_score:
+            return TerminationReasonEnum.TargetScore
+        if self.max_evaluations is not None and next_evaluations > self.max_evaluations:
+            return TerminationReasonEnum.MaxEvaluations
+        if self.stale_limit is not None and stale_for >= self.stale_limit:
+            return TerminationReasonEnum.StaleLimit
+        if perf_counter() >= self.deadline:
+            return TerminationReasonEnum.TimeBudget
+        return None